@@ -0,0 +1,232 @@
+# Drives the endpoint mix of postman/Conduit.postman_collection.json against a running server, with many virtual
+# users at once, and reports throughput and latency percentiles per route. Requires httpx.
+#
+#   uvicorn realworld.main:app --workers 4 &
+#   python -m benchmarks.load --url http://127.0.0.1:8000/api --users 50 --duration 60 --write-ratio 0.1
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+Action = Callable[[], Awaitable[None]]
+
+TAGS = ["dragons", "training", "python", "fastapi", "realworld"]
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+@dataclass
+class Shared:
+    # Known to every virtual user, so that they read and react to each other's writes
+    usernames: list[str] = field(default_factory=list)
+    slugs: list[str] = field(default_factory=list)
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, shared: Shared, rng: random.Random) -> None:
+        self.client = client
+        self.stats = stats
+        self.shared = shared
+        self.rng = rng
+        self.username = f"load-{uuid.uuid4().hex[:12]}"
+        self.email = f"{self.username}@example.com"
+        self.password = "password"
+        self.headers: dict[str, str] = {}
+
+    async def request(self, route: str, method: str, path: str, **kwargs: Any) -> httpx.Response | None:  # noqa: ANN401
+        # Timed and grouped by route template, like the server's metrics
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.stats.errors[route] += 1
+            return None
+
+        self.stats.latencies[route].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.stats.errors[route] += 1
+        return response
+
+    async def register(self) -> None:
+        user = {"username": self.username, "email": self.email, "password": self.password}
+        response = await self.request("POST /users", "POST", "/users", json={"user": user})
+        if response is None or response.status_code >= 400:
+            raise RuntimeError(f"could not register {self.username}: {response and response.text}")
+        self.headers = {"Authorization": f"Token {response.json()['user']['token']}"}
+        self.shared.usernames.append(self.username)
+        await self.create_article()
+
+    # Reads
+
+    async def list_articles(self) -> None:
+        await self.request("GET /articles", "GET", "/articles", params={"limit": 20})
+
+    async def list_articles_by_tag(self) -> None:
+        await self.request("GET /articles?tag", "GET", "/articles", params={"tag": self.rng.choice(TAGS)})
+
+    async def list_articles_by_author(self) -> None:
+        params = {"author": self.rng.choice(self.shared.usernames)}
+        await self.request("GET /articles?author", "GET", "/articles", params=params)
+
+    async def list_articles_favorited(self) -> None:
+        params = {"favorited": self.rng.choice(self.shared.usernames)}
+        await self.request("GET /articles?favorited", "GET", "/articles", params=params)
+
+    async def feed(self) -> None:
+        await self.request("GET /articles/feed", "GET", "/articles/feed")
+
+    async def get_article(self) -> None:
+        await self.request("GET /articles/{slug}", "GET", f"/articles/{self.rng.choice(self.shared.slugs)}")
+
+    async def get_comments(self) -> None:
+        slug = self.rng.choice(self.shared.slugs)
+        await self.request("GET /articles/{slug}/comments", "GET", f"/articles/{slug}/comments")
+
+    async def get_profile(self) -> None:
+        await self.request("GET /profiles/{username}", "GET", f"/profiles/{self.rng.choice(self.shared.usernames)}")
+
+    async def get_tags(self) -> None:
+        await self.request("GET /tags", "GET", "/tags")
+
+    async def get_current_user(self) -> None:
+        await self.request("GET /user", "GET", "/user")
+
+    # Writes
+
+    async def login(self) -> None:
+        user = {"email": self.email, "password": self.password}
+        await self.request("POST /users/login", "POST", "/users/login", json={"user": user})
+
+    async def create_article(self) -> None:
+        title = f"How to train your dragon {uuid.uuid4().hex[:12]}"
+        article = {
+            "title": title,
+            "description": "Ever wonder how?",
+            "body": "Very carefully. " * 50,
+            "tagList": self.rng.sample(TAGS, k=2),
+        }
+        response = await self.request("POST /articles", "POST", "/articles", json={"article": article})
+        if response is not None and response.status_code < 400:
+            self.shared.slugs.append(response.json()["article"]["slug"])
+
+    async def favorite(self) -> None:
+        slug = self.rng.choice(self.shared.slugs)
+        await self.request("POST /articles/{slug}/favorite", "POST", f"/articles/{slug}/favorite")
+
+    async def unfavorite(self) -> None:
+        slug = self.rng.choice(self.shared.slugs)
+        await self.request("DELETE /articles/{slug}/favorite", "DELETE", f"/articles/{slug}/favorite")
+
+    async def comment(self) -> None:
+        slug = self.rng.choice(self.shared.slugs)
+        comment = {"body": "Thank you so much!"}
+        await self.request(
+            "POST /articles/{slug}/comments", "POST", f"/articles/{slug}/comments", json={"comment": comment}
+        )
+
+    async def follow(self) -> None:
+        username = self.rng.choice(self.shared.usernames)
+        await self.request("POST /profiles/{username}/follow", "POST", f"/profiles/{username}/follow")
+
+    async def unfollow(self) -> None:
+        username = self.rng.choice(self.shared.usernames)
+        await self.request("DELETE /profiles/{username}/follow", "DELETE", f"/profiles/{username}/follow")
+
+    def mix(self) -> tuple[dict[Action, int], dict[Action, int]]:
+        # Reads and writes with their relative weights, the global list being by far the most requested
+        reads: dict[Action, int] = {
+            self.list_articles: 30,
+            self.list_articles_by_tag: 10,
+            self.list_articles_by_author: 5,
+            self.list_articles_favorited: 5,
+            self.feed: 15,
+            self.get_article: 15,
+            self.get_comments: 10,
+            self.get_profile: 5,
+            self.get_tags: 10,
+            self.get_current_user: 5,
+        }
+        writes: dict[Action, int] = {
+            self.favorite: 30,
+            self.unfavorite: 15,
+            self.comment: 20,
+            self.follow: 10,
+            self.unfollow: 5,
+            self.create_article: 10,
+            self.login: 10,
+        }
+        return reads, writes
+
+    async def run(self, *, deadline: float, write_ratio: float, think_time: float) -> None:
+        reads, writes = self.mix()
+        while time.monotonic() < deadline:
+            if self.rng.random() < write_ratio:
+                (action,) = self.rng.choices(list(writes), weights=list(writes.values()))
+            else:
+                (action,) = self.rng.choices(list(reads), weights=list(reads.values()))
+            await action()
+            if think_time > 0:
+                await asyncio.sleep(self.rng.expovariate(1 / think_time))
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def report(stats: Stats, elapsed: float) -> None:
+    print(f"{'route':<36} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    total = 0
+    for route in sorted(stats.latencies, key=lambda route: -len(stats.latencies[route])):
+        latencies = sorted(stats.latencies[route])
+        total += len(latencies)
+        print(
+            f"{route:<36} {len(latencies):>9} {stats.errors[route]:>7} {len(latencies) / elapsed:>8.1f} "
+            f"{percentile(latencies, 0.50) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} "
+            f"{percentile(latencies, 0.99) * 1000:>8.1f}"
+        )
+    print(f"{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} req/s, {sum(stats.errors.values())} errors")
+
+
+async def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        setup_stats = Stats()
+        shared = Shared()
+        users = [VirtualUser(client, setup_stats, shared, random.Random(rng.random())) for _ in range(args.users)]
+        # Registration isn't part of the measured mix, it's mostly password hashing
+        for start in range(0, len(users), 10):
+            await asyncio.gather(*(user.register() for user in users[start : start + 10]))
+
+        stats = Stats()
+        for user in users:
+            user.stats = stats
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(user.run(deadline=deadline, write_ratio=args.write_ratio, think_time=args.think_time) for user in users)
+        )
+        report(stats, time.monotonic() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay the Conduit endpoint mix against a running server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api", help="base URL of the API")
+    parser.add_argument("--users", type=int, default=20, help="virtual users, each with one request in flight")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run for")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="share of requests that write")
+    parser.add_argument("--think-time", type=float, default=0, help="mean pause between a user's requests, seconds")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds before a request is abandoned")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+# Pins how many queries the hot paths run, so that a change adding one (or a query per row) fails loudly.
+# Needs the database from .env. It creates its own users and article, and deletes them afterwards.
+#
+#   python -m benchmarks.query_counts
+import asyncio
+import uuid
+
+from sqlalchemy import delete
+
+import realworld.models  # noqa: F401
+from realworld.articles import service as article_service
+from realworld.articles.schema import ArticleCreate, ListArticlesQuery, ListCommentsQuery
+from realworld.database.core import sessionmaker
+from realworld.database.instrumentation import assert_max_queries
+from realworld.profiles import service as profile_service
+from realworld.users import service as user_service
+from realworld.users.model import RealWorldUser
+from realworld.users.schema import AuthUser, NewUser, User
+
+
+def as_auth_user(user: RealWorldUser) -> AuthUser:
+    return AuthUser(**User.from_orm(user).dict(), user_id=user.id)
+
+
+async def main() -> None:
+    suffix = uuid.uuid4().hex[:8]
+    async with sessionmaker() as db:
+        author = as_auth_user(
+            await user_service.create_user(
+                db,
+                user_in=NewUser(username=f"author-{suffix}", email=f"author-{suffix}@example.com", password="secret"),
+            )
+        )
+        reader = as_auth_user(
+            await user_service.create_user(
+                db,
+                user_in=NewUser(username=f"reader-{suffix}", email=f"reader-{suffix}@example.com", password="secret"),
+            )
+        )
+        article = await article_service.create_article(
+            db,
+            article_in=ArticleCreate(title=f"Query counts {suffix}", description="-", body="-"),
+            user=author,
+        )
+        for i in range(5):
+            await article_service.add_artcicle_comment(db, slug=article.slug, body=f"Comment {i}", current_user=author)
+        await profile_service.follow_user(db, username=author.username, current_user=reader)
+
+    try:
+        # The page, plus the viewer's favorites and followed authors for the whole page
+        async with sessionmaker() as db:
+            with assert_max_queries(1, "get_articles as anonymous"):
+                await article_service.get_articles(db, params=ListArticlesQuery(), current_user=None)
+        async with sessionmaker() as db:
+            with assert_max_queries(3, "get_articles"):
+                await article_service.get_articles(db, params=ListArticlesQuery(), current_user=reader)
+        # Filters are part of the page's query, usernames aren't looked up beforehand
+        async with sessionmaker() as db:
+            with assert_max_queries(3, "get_articles by author"):
+                await article_service.get_articles(
+                    db, params=ListArticlesQuery(author=author.username), current_user=reader
+                )
+        async with sessionmaker() as db:
+            with assert_max_queries(3, "get_articles favorited"):
+                await article_service.get_articles(
+                    db, params=ListArticlesQuery(favorited=reader.username), current_user=reader
+                )
+
+        # The article, the page of comments, then the followed commenters
+        async with sessionmaker() as db:
+            with assert_max_queries(2, "get_comments as anonymous"):
+                await article_service.get_comments(db, slug=article.slug, params=ListCommentsQuery(), current_user=None)
+        async with sessionmaker() as db:
+            with assert_max_queries(3, "get_comments"):
+                await article_service.get_comments(
+                    db, slug=article.slug, params=ListCommentsQuery(), current_user=reader
+                )
+
+        # The article and its author, the favorite and the counter, then the favorited and following flags
+        async with sessionmaker() as db:
+            with assert_max_queries(6, "favorite_article"):
+                await article_service.favorite_article(db, slug=article.slug, current_user=reader)
+
+        print("Query counts are within their pins")
+    finally:
+        async with sessionmaker() as db:
+            await article_service.delete_article(db, slug=article.slug, user=author)
+            await db.execute(delete(RealWorldUser).where(RealWorldUser.id.in_([author.user_id, reader.user_id])))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+# Seeds a database with generated users, follows, articles, favorites and comments, in bulk. Denormalized counters
+# and feeds are computed afterwards, the way the repair commands and the fan-out would have left them.
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from realworld.articles import service as article_service
+from realworld.articles.model import ArticleComment, ArticleFavorite, ArticleTag, RealWorldArticle, Tag
+from realworld.feed import service as feed_service
+from realworld.profiles import service as profile_service
+from realworld.profiles.model import Follow
+from realworld.users.model import RealWorldUser
+from realworld.users.passwords import password_hasher
+
+PASSWORD = "password"
+TAGS = [f"tag-{i}" for i in range(50)]
+# Rows per INSERT, well under the 32767 bind parameters a statement can have
+BATCH_SIZE = 2_000
+
+
+@dataclass
+class Volumes:
+    users: int = 1_000
+    follows_per_user: int = 20
+    articles: int = 5_000
+    favorites_per_user: int = 20
+    comments: int = 20_000
+
+
+@dataclass
+class Seeded:
+    user_ids: list[uuid.UUID]
+    article_slugs: list[str]
+    # The user following the most authors, for feeds, and the article with the most comments
+    reader_id: uuid.UUID
+    commented_slug: str
+
+
+async def _insert(db: AsyncSession, table: Any, rows: list[dict[str, Any]]) -> None:  # noqa: ANN401
+    for start in range(0, len(rows), BATCH_SIZE):
+        await db.execute(insert(table), rows[start : start + BATCH_SIZE])
+
+
+async def seed(db: AsyncSession, volumes: Volumes, *, rng: random.Random) -> Seeded:
+    # Every user has the same password, hashing it once keeps seeding fast
+    password_hash = await password_hasher.hash(PASSWORD)
+    now = datetime.now(tz=UTC)
+
+    user_ids = [uuid.uuid4() for _ in range(volumes.users)]
+    await _insert(
+        db,
+        RealWorldUser,
+        [
+            {"id": user_id, "username": f"user-{i}", "email": f"user-{i}@example.com", "password_hash": password_hash}
+            for i, user_id in enumerate(user_ids)
+        ],
+    )
+
+    # A few popular authors get most of the follows, like on a real site
+    follows = {
+        (follower_id, followed_id)
+        for follower_id in user_ids
+        for followed_id in rng.choices(
+            user_ids, weights=[1 / (rank + 1) for rank in range(len(user_ids))], k=volumes.follows_per_user
+        )
+        if follower_id != followed_id
+    }
+    await _insert(
+        db, Follow, [{"following_user_id": follower, "followed_user_id": followed} for follower, followed in follows]
+    )
+
+    await _insert(db, Tag, [{"name": name, "articles_count": 0} for name in TAGS])
+    articles: list[dict[str, Any]] = []
+    article_tags: list[dict[str, Any]] = []
+    for i in range(volumes.articles):
+        article_id = uuid.uuid4()
+        created_at = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+        tag_list = sorted(rng.sample(TAGS, k=rng.randint(0, 4)))
+        articles.append(
+            {
+                "id": article_id,
+                "user_id": rng.choice(user_ids),
+                "slug": f"article-{i}",
+                "title": f"Article {i}",
+                "description": f"Description of article {i}",
+                "body": " ".join(rng.choices(TAGS, k=200)),
+                "tag_list": tag_list,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+        article_tags.extend({"article_id": article_id, "tag_name": name} for name in tag_list)
+    await _insert(db, RealWorldArticle, articles)
+    await _insert(db, ArticleTag, article_tags)
+
+    article_ids = [article["id"] for article in articles]
+    favorites = {
+        (user_id, article_id)
+        for user_id in user_ids
+        for article_id in rng.sample(article_ids, k=min(volumes.favorites_per_user, len(article_ids)))
+    }
+    await _insert(db, ArticleFavorite, [{"user_id": user, "article_id": article} for user, article in favorites])
+
+    # Comments are skewed towards a few articles as well
+    commented = rng.choices(
+        article_ids, weights=[1 / (rank + 1) for rank in range(len(article_ids))], k=volumes.comments
+    )
+    await _insert(
+        db,
+        ArticleComment,
+        [
+            {"article_id": article_id, "user_id": rng.choice(user_ids), "body": f"Comment {i}"}
+            for i, article_id in enumerate(commented)
+        ],
+    )
+
+    await db.commit()
+    await article_service.repair_favorites_counts(db)
+    await article_service.repair_articles_count(db)
+    await article_service.repair_tag_counts(db)
+    await profile_service.repair_followers_counts(db)
+
+    await feed_service.rebuild_feeds(db)
+
+    reader_id = await db.scalar(
+        select(Follow.following_user_id).group_by(Follow.following_user_id).order_by(func.count().desc()).limit(1)
+    )
+    commented_slug = await db.scalar(
+        select(RealWorldArticle.slug)
+        .join(ArticleComment, ArticleComment.article_id == RealWorldArticle.id)
+        .group_by(RealWorldArticle.slug)
+        .order_by(func.count().desc())
+        .limit(1)
+    )
+    return Seeded(
+        user_ids=user_ids,
+        article_slugs=[article["slug"] for article in articles],
+        reader_id=reader_id or user_ids[0],
+        commented_slug=commented_slug or articles[0]["slug"],
+    )
@@ -0,0 +1,82 @@
+# Compares the time spent turning a page of articles into a response body: FastAPI validating it against the
+# response_model and encoding it with the json module, against the FAST_JSON_RESPONSES path.
+#
+#   python -m benchmarks.serialization --articles 100 --rounds 500
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from realworld.articles.schema import Article, MultipleArticlesBody
+from realworld.profiles.schema import Profile
+
+
+def build_page(size: int) -> MultipleArticlesBody:
+    now = datetime.now(tz=UTC)
+    articles = [
+        Article(
+            slug=f"article-{i}-{uuid.uuid4()}",
+            title=f"Article {i}",
+            description="A description of the article",
+            body="The body of the article. " * 40,
+            tag_list=["python", "fastapi", "realworld"],
+            created_at=now,
+            updated_at=now,
+            favorited=i % 3 == 0,
+            favorites_count=i,
+            author=Profile(username=f"author-{i % 10}", bio="Writes articles", image=None, following=i % 2 == 0),
+        )
+        for i in range(size)
+    ]
+    return MultipleArticlesBody(articles=articles, articles_count=size * 10)
+
+
+async def measure(render: Callable[[], Awaitable[bytes]], rounds: int) -> float:
+    # Seconds per render, after one warm-up round
+    await render()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await render()
+    return (time.perf_counter() - start) / rounds
+
+
+async def main(args: argparse.Namespace) -> None:
+    page = build_page(args.articles)
+    field = create_response_field(name="Response_list_articles", type_=MultipleArticlesBody)
+
+    async def response_model() -> bytes:
+        return JSONResponse(await serialize_response(field=field, response_content=page)).body
+
+    async def without_validation() -> bytes:
+        return JSONResponse(jsonable_encoder(page)).body
+
+    async def fast() -> bytes:
+        return orjson.dumps(page.dict(by_alias=True))
+
+    # Both paths have to send the same document
+    assert json.loads(await response_model()) == json.loads(await fast())
+
+    results = {
+        name: await measure(render, args.rounds)
+        for name, render in (("response_model", response_model), ("no validation", without_validation), ("fast", fast))
+    }
+    baseline = results["response_model"]
+    print(f"{args.articles} articles, {args.rounds} rounds")
+    for name, seconds in results.items():
+        print(f"{name:>16}: {seconds * 1000:8.3f} ms/request, saves {(baseline - seconds) * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serializing a page of articles")
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,296 @@
+# Times the service layer against a throwaway database seeded with generated data, and compares the results with a
+# stored baseline. It creates a new database on the server configured in .env and drops it afterwards.
+#
+#   python -m benchmarks.suite --update-baseline    # record benchmarks/baseline.json on this machine
+#   python -m benchmarks.suite                      # fails when a path got slower or runs more queries
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import realworld.models  # noqa: F401
+from realworld import config
+from realworld.articles import service as article_service
+from realworld.articles.model import ArticleFavorite, RealWorldArticle
+from realworld.articles.schema import ListArticlesQuery, ListCommentsQuery
+from realworld.database.core import Base
+from realworld.database.instrumentation import capture_queries, instrument_engine
+from realworld.users.cache import auth_user_cache
+from realworld.users.dependencies import get_current_user
+from realworld.users.model import RealWorldUser
+from realworld.users.schema import AuthUser, User
+
+from .seed import TAGS, Volumes, seed
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+@dataclass
+class Result:
+    median_ms: float
+    p95_ms: float
+    queries: int
+
+
+Call = Callable[[AsyncSession], Awaitable[Any]]
+Hook = Callable[[], Awaitable[None] | None]
+
+
+def database_url(name: str) -> URL:
+    return make_url(config.SQLALCHEMY_DATABASE_URI).set(database=name)
+
+
+async def run_in_maintenance_database(statement: str) -> None:
+    engine = create_async_engine(database_url("postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text(statement))
+    finally:
+        await engine.dispose()
+
+
+async def measure(
+    sessions: async_sessionmaker[AsyncSession],
+    call: Call,
+    *,
+    iterations: int,
+    before: Hook | None = None,
+    after: Hook | None = None,
+) -> Result:
+    # Every call gets a new session, like a request. The first one warms up caches and isn't counted.
+    wall_times = []
+    queries = 0
+    for iteration in range(iterations + 1):
+        if before is not None and (pending := before()) is not None:
+            await pending
+
+        async with sessions() as db:
+            with capture_queries() as log:
+                start = time.perf_counter()
+                await call(db)
+                elapsed = time.perf_counter() - start
+
+        if after is not None and (pending := after()) is not None:
+            await pending
+
+        if iteration > 0:
+            wall_times.append(elapsed * 1000)
+            queries = max(queries, log.count)
+
+    return Result(
+        median_ms=statistics.median(wall_times),
+        p95_ms=statistics.quantiles(wall_times, n=20)[-1] if len(wall_times) > 1 else wall_times[0],
+        queries=queries,
+    )
+
+
+async def run_benchmarks(sessions: async_sessionmaker[AsyncSession], args: argparse.Namespace) -> dict[str, Result]:
+    async with sessions() as db:
+        seeded = await seed(
+            db, Volumes(**{name: getattr(args, name) for name in Volumes.__annotations__}), rng=random.Random(args.seed)
+        )
+        reader_row = await db.scalar(select(RealWorldUser).where(RealWorldUser.id == seeded.reader_id))
+        assert reader_row is not None
+        token = reader_row.gen_jwt()
+        reader = AuthUser(**User.from_orm(reader_row).dict(), user_id=reader_row.id, token=token)
+        # An article the reader hasn't favorited, favorited and unfavorited again on every iteration
+        unfavorited_slug = await db.scalar(
+            select(RealWorldArticle.slug)
+            .where(
+                ~RealWorldArticle.id.in_(
+                    select(ArticleFavorite.article_id).where(ArticleFavorite.user_id == reader_row.id)
+                )
+            )
+            .limit(1)
+        )
+        assert unfavorited_slug is not None
+
+    async def unfavorite() -> None:
+        async with sessions() as db:
+            await article_service.unfavorite_article(db, slug=unfavorited_slug, current_user=reader)
+
+    benchmarks: dict[str, tuple[Call, Hook | None, Hook | None]] = {
+        "get_articles": (
+            lambda db: article_service.get_articles(db, params=ListArticlesQuery(), current_user=reader),
+            None,
+            None,
+        ),
+        "get_articles_anonymous": (
+            lambda db: article_service.get_articles(db, params=ListArticlesQuery(), current_user=None),
+            None,
+            None,
+        ),
+        "get_articles_by_tag": (
+            lambda db: article_service.get_articles(db, params=ListArticlesQuery(tag=TAGS[0]), current_user=reader),
+            None,
+            None,
+        ),
+        "get_articles_by_author": (
+            lambda db: article_service.get_articles(db, params=ListArticlesQuery(author="user-0"), current_user=reader),
+            None,
+            None,
+        ),
+        "get_articles_favorited": (
+            lambda db: article_service.get_articles(
+                db, params=ListArticlesQuery(favorited=reader.username), current_user=reader
+            ),
+            None,
+            None,
+        ),
+        "get_feed_articles": (
+            lambda db: article_service.get_feed_articles(db, params=ListArticlesQuery(), current_user=reader),
+            None,
+            None,
+        ),
+        "get_comments": (
+            lambda db: article_service.get_comments(
+                db, slug=seeded.commented_slug, params=ListCommentsQuery(), current_user=reader
+            ),
+            None,
+            None,
+        ),
+        "get_tags": (article_service.get_tags, None, None),
+        "favorite_article": (
+            lambda db: article_service.favorite_article(db, slug=unfavorited_slug, current_user=reader),
+            None,
+            unfavorite,
+        ),
+        # Without the cache of authenticated users, which would otherwise answer every call
+        "get_current_user": (
+            lambda db: get_current_user(authorization=f"Token {token}"),
+            lambda: auth_user_cache.invalidate_user(seeded.reader_id),
+            None,
+        ),
+    }
+
+    results = {}
+    for name, (call, before, after) in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = await measure(sessions, call, iterations=args.iterations, before=before, after=after)
+    return results
+
+
+# The indexes the filtered lists are expected to use on the seeded data, any one of each set being enough
+PLAN_CHECKS: dict[str, tuple[ListArticlesQuery, set[str]]] = {
+    "tag": (ListArticlesQuery(tag=TAGS[0]), {"ix_article_tags_gin"}),
+    "author": (ListArticlesQuery(author="user-0"), {"ix_user_username"}),
+    "favorited": (ListArticlesQuery(favorited="user-0"), {"ix_article_favorite_user_id_article_id"}),
+}
+
+
+def index_names(plan: dict[str, Any]) -> set[str]:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= index_names(child)
+    return names
+
+
+async def check_plans(sessions: async_sessionmaker[AsyncSession]) -> list[str]:
+    # Explains the first page of each filtered list the way get_articles_page runs it, with its window count
+    problems = []
+    async with sessions() as db:
+        await db.execute(text("ANALYZE"))
+        for name, (params, expected) in PLAN_CHECKS.items():
+            query = article_service.paginate_articles(
+                article_service.build_filter_query(select(RealWorldArticle, RealWorldUser), params=params), params
+            ).add_columns(func.count().over())
+            compiled = query.compile(db.bind, compile_kwargs={"literal_binds": True})
+            connection = await db.connection()
+            (plan,) = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+            used = index_names(plan["Plan"])
+            if not used & expected:
+                problems.append(
+                    f"the {name} filter uses {sorted(used) or 'no index'}, expected one of {sorted(expected)}"
+                )
+    return problems
+
+
+def compare(results: dict[str, Result], baseline: dict[str, Any], *, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        if (expected := baseline.get("results", {}).get(name)) is None:
+            continue
+        if result.queries > expected["queries"]:
+            regressions.append(f"{name} runs {result.queries} queries, the baseline ran {expected['queries']}")
+        if result.median_ms > expected["median_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name} takes {result.median_ms:.2f} ms, more than {tolerance:.0%} over the baseline's "
+                f"{expected['median_ms']:.2f} ms"
+            )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    database = args.database or f"realworld_benchmark_{uuid.uuid4().hex[:8]}"
+    if not args.database:
+        await run_in_maintenance_database(f'CREATE DATABASE "{database}"')
+
+    engine = create_async_engine(database_url(database), pool_size=config.DATABASE_ENGINE_POOL_SIZE)
+    instrument_engine(engine)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        results = await run_benchmarks(sessions, args)
+        plan_problems = await check_plans(sessions)
+    finally:
+        await engine.dispose()
+        if not args.database and not args.keep:
+            await run_in_maintenance_database(f'DROP DATABASE "{database}" WITH (FORCE)')
+
+    print(f"{'benchmark':<24} {'median ms':>10} {'p95 ms':>10} {'queries':>8}")
+    for name, result in results.items():
+        print(f"{name:<24} {result.median_ms:>10.2f} {result.p95_ms:>10.2f} {result.queries:>8}")
+
+    if plan_problems:
+        print("\n".join(["Query plans:", *plan_problems]))
+        return 1
+
+    volumes = {name: getattr(args, name) for name in Volumes.__annotations__}
+    if args.update_baseline:
+        baseline = {"volumes": volumes, "results": {name: asdict(result) for name, result in results.items()}}
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if not BASELINE_PATH.exists():
+        print("No baseline to compare with, record one with --update-baseline")
+        return 0
+
+    baseline = json.loads(BASELINE_PATH.read_text())
+    if baseline["volumes"] != volumes:
+        print(f"The baseline was recorded with other volumes ({baseline['volumes']}), not comparing")
+        return 0
+
+    if regressions := compare(results, baseline, tolerance=args.tolerance):
+        print("\n".join(["Regressions:", *regressions]))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the service layer against seeded data")
+    defaults = Volumes()
+    for name in Volumes.__annotations__:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=getattr(defaults, name))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1, help="seed of the generated data")
+    parser.add_argument("--only", nargs="*", help="names of the benchmarks to run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown over the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--database", help="an existing, empty database to use instead of a throwaway one")
+    parser.add_argument("--keep", action="store_true", help="don't drop the throwaway database")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,32 @@
+"""article changed_at
+
+Revision ID: 8b1d5f2e6a04
+Revises: 4a7c2e9f5b31
+Create Date: 2026-10-19 02:14:37.604191
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8b1d5f2e6a04"
+down_revision = "4a7c2e9f5b31"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing articles start out changed at the time of the migration, so the next incremental export includes them
+    # all once, with the favorites counts that exports ordered by updated_at missed
+    op.add_column(
+        "article", sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False)
+    )
+    op.drop_index("ix_article_updated_at_id", table_name="article")
+    op.create_index("ix_article_changed_at_id", "article", ["changed_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_changed_at_id", table_name="article")
+    op.create_index("ix_article_updated_at_id", "article", ["updated_at", "id"], unique=False)
+    op.drop_column("article", "changed_at")
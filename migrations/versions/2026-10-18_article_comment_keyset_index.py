@@ -0,0 +1,32 @@
+"""article comment keyset index
+
+Revision ID: 0e6b94f3d521
+Revises: c41e87d09b3a
+Create Date: 2026-10-18 15:08:33.901427
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0e6b94f3d521"
+down_revision = "c41e87d09b3a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_article_comment_article_id_created_at",
+        "article_comment",
+        ["article_id", "created_at", "id"],
+        unique=False,
+    )
+    # Redundant with the prefix of the new index
+    op.drop_index("ix_article_comment_article_id", table_name="article_comment")
+
+
+def downgrade() -> None:
+    op.create_index("ix_article_comment_article_id", "article_comment", ["article_id"], unique=False)
+    op.drop_index("ix_article_comment_article_id_created_at", table_name="article_comment")
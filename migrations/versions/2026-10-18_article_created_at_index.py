@@ -0,0 +1,24 @@
+"""article created_at index
+
+Revision ID: 3b7e2f91a4c6
+Revises: d09a615180d2
+Create Date: 2026-10-18 09:12:41.208315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3b7e2f91a4c6"
+down_revision = "d09a615180d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_article_created_at_id", "article", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_created_at_id", table_name="article")
@@ -0,0 +1,41 @@
+"""article fanned out
+
+Revision ID: 4a7c2e9f5b31
+Revises: 6e3b9a1d4c72
+Create Date: 2026-10-19 00:31:54.117820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4a7c2e9f5b31"
+down_revision = "6e3b9a1d4c72"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("article", sa.Column("fanned_out", sa.Boolean(), server_default="false", nullable=False))
+    # Articles that were copied into feeds, and those whose author had no followers to copy them to. Articles of
+    # authors that had too many followers when they were published are left to be merged into feeds on read.
+    op.execute(
+        """
+        UPDATE article SET fanned_out = true
+        WHERE EXISTS (SELECT 1 FROM feed_entry WHERE feed_entry.article_id = article.id)
+        OR NOT EXISTS (SELECT 1 FROM follow WHERE follow.followed_user_id = article.user_id)
+        """
+    )
+    op.create_index(
+        "ix_article_user_id_created_at_pulled",
+        "article",
+        ["user_id", "created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("NOT fanned_out"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_user_id_created_at_pulled", table_name="article")
+    op.drop_column("article", "fanned_out")
@@ -0,0 +1,29 @@
+"""article favorite user_id index
+
+Revision ID: 2f8a4d6c1e93
+Revises: 9c5e1f3a7b20
+Create Date: 2026-10-18 23:05:47.268114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2f8a4d6c1e93"
+down_revision = "9c5e1f3a7b20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_article_favorite_user_id_article_id",
+        "article_favorite",
+        ["user_id", "article_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_favorite_user_id_article_id", table_name="article_favorite")
@@ -0,0 +1,32 @@
+"""article favorites count
+
+Revision ID: 8f4c1d2e6a07
+Revises: 3b7e2f91a4c6
+Create Date: 2026-10-18 10:03:27.550912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8f4c1d2e6a07"
+down_revision = "3b7e2f91a4c6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("article", sa.Column("favorites_count", sa.Integer(), server_default="0", nullable=False))
+    op.execute(
+        """
+        UPDATE article
+        SET favorites_count = favorites.count
+        FROM (SELECT article_id, count(*) AS count FROM article_favorite GROUP BY article_id) AS favorites
+        WHERE article.id = favorites.article_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("article", "favorites_count")
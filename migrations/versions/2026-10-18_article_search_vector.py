@@ -0,0 +1,39 @@
+"""article search vector
+
+Revision ID: 7d2a6e0c9f45
+Revises: 0e6b94f3d521
+Create Date: 2026-10-18 16:20:14.662078
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "7d2a6e0c9f45"
+down_revision = "0e6b94f3d521"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "article",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', title), 'A') || "
+                "setweight(to_tsvector('english', description), 'B') || "
+                "setweight(to_tsvector('english', body), 'C')",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_article_search_vector_gin", "article", ["search_vector"], unique=False, postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_search_vector_gin", table_name="article", postgresql_using="gin")
+    op.drop_column("article", "search_vector")
@@ -0,0 +1,31 @@
+"""articles count
+
+Revision ID: 6e3b9a1d4c72
+Revises: 2f8a4d6c1e93
+Create Date: 2026-10-18 23:48:12.604391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6e3b9a1d4c72"
+down_revision = "2f8a4d6c1e93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "articles_count",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("count", sa.BigInteger(), server_default="0", nullable=False),
+        sa.CheckConstraint("id = 1", name="ck_articles_count_single_row"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO articles_count (id, count) SELECT 1, count(*) FROM article")
+
+
+def downgrade() -> None:
+    op.drop_table("articles_count")
@@ -0,0 +1,61 @@
+"""feed entry
+
+Revision ID: 5a9d3c7b2e18
+Revises: 8f4c1d2e6a07
+Create Date: 2026-10-18 11:41:09.372650
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5a9d3c7b2e18"
+down_revision = "8f4c1d2e6a07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("user", sa.Column("followers_count", sa.Integer(), server_default="0", nullable=False))
+    op.execute(
+        """
+        UPDATE "user"
+        SET followers_count = follows.count
+        FROM (SELECT followed_user_id, count(*) AS count FROM follow GROUP BY followed_user_id) AS follows
+        WHERE "user".id = follows.followed_user_id
+        """
+    )
+    op.create_index("ix_article_user_id_created_at", "article", ["user_id", "created_at", "id"], unique=False)
+    op.create_table(
+        "feed_entry",
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("article_id", sa.Uuid(), nullable=False),
+        sa.Column("author_id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["article_id"], ["article.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["author_id"], ["user.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "article_id"),
+    )
+    op.create_index("ix_feed_entry_user_id_author_id", "feed_entry", ["user_id", "author_id"], unique=False)
+    op.create_index(
+        "ix_feed_entry_user_id_created_at", "feed_entry", ["user_id", "created_at", "article_id"], unique=False
+    )
+    # Materialize the feeds of existing follows. Entries of authors over the fan-out limit are harmless, the feed
+    # query merges them with the articles it pulls for those authors.
+    op.execute(
+        """
+        INSERT INTO feed_entry (user_id, article_id, author_id, created_at)
+        SELECT follow.following_user_id, article.id, article.user_id, article.created_at
+        FROM follow JOIN article ON article.user_id = follow.followed_user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feed_entry_user_id_created_at", table_name="feed_entry")
+    op.drop_index("ix_feed_entry_user_id_author_id", table_name="feed_entry")
+    op.drop_table("feed_entry")
+    op.drop_index("ix_article_user_id_created_at", table_name="article")
+    op.drop_column("user", "followers_count")
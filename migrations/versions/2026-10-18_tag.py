@@ -0,0 +1,57 @@
+"""tag
+
+Revision ID: c41e87d09b3a
+Revises: 5a9d3c7b2e18
+Create Date: 2026-10-18 13:26:52.114093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c41e87d09b3a"
+down_revision = "5a9d3c7b2e18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tag",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("articles_count", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.create_index("ix_tag_articles_count_name", "tag", [sa.text("articles_count DESC"), "name"], unique=False)
+    op.create_table(
+        "article_tag",
+        sa.Column("article_id", sa.Uuid(), nullable=False),
+        sa.Column("tag_name", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["article_id"], ["article.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tag_name"], ["tag.name"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("article_id", "tag_name"),
+    )
+    op.create_index("ix_article_tag_tag_name_article_id", "article_tag", ["tag_name", "article_id"], unique=False)
+    op.execute(
+        """
+        INSERT INTO tag (name, articles_count)
+        SELECT tag_name, count(DISTINCT article.id)
+        FROM article, unnest(article.tag_list) AS tag_name
+        GROUP BY tag_name
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO article_tag (article_id, tag_name)
+        SELECT DISTINCT article.id, tag_name
+        FROM article, unnest(article.tag_list) AS tag_name
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_tag_tag_name_article_id", table_name="article_tag")
+    op.drop_table("article_tag")
+    op.drop_index("ix_tag_articles_count_name", table_name="tag")
+    op.drop_table("tag")
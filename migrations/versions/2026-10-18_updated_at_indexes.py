@@ -0,0 +1,26 @@
+"""updated_at indexes
+
+Revision ID: 9c5e1f3a7b20
+Revises: 7d2a6e0c9f45
+Create Date: 2026-10-18 21:42:10.517203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9c5e1f3a7b20"
+down_revision = "7d2a6e0c9f45"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_article_updated_at_id", "article", ["updated_at", "id"], unique=False)
+    op.create_index("ix_article_comment_updated_at_id", "article_comment", ["updated_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_comment_updated_at_id", table_name="article_comment")
+    op.drop_index("ix_article_updated_at_id", table_name="article")
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
+from realworld import config
 from realworld.articles.router import router as articles_router
+from realworld.internal.router import router as internal_router
 from realworld.profiles.router import router as profiles_router
 from realworld.users.router import router as users_router
 
@@ -8,3 +10,6 @@ api_router = APIRouter()
 api_router.include_router(users_router, tags=["user", "users"])
 api_router.include_router(profiles_router, tags=["profiles"])
 api_router.include_router(articles_router, tags=["articles"])
+
+if config.INTERNAL_ENDPOINTS_ENABLED:
+    api_router.include_router(internal_router, tags=["internal"])
@@ -0,0 +1,77 @@
+from collections.abc import Iterable
+
+from realworld.articles.schema import ListArticlesQuery, ListCommentsQuery
+from realworld.response_cache import response_cache
+
+# Every cached entry is tagged with what it depends on, so that writes only drop the entries they affect.
+# An entry filtered by several things is tagged with each of them, dropping it when any of them changes.
+ARTICLES = "articles"
+ALL_ARTICLES = "articles:all"
+FAVORITED_ARTICLES = "articles:favorited"
+COMMENTS = "comments"
+TAGS = "tags"
+
+
+def _tag_tag(tag: str) -> str:
+    return f"articles:tag:{tag}"
+
+
+def _author_tag(username: str) -> str:
+    return f"articles:author:{username}"
+
+
+def _comments_tag(slug: str) -> str:
+    return f"comments:{slug}"
+
+
+def articles_key(params: ListArticlesQuery) -> str:
+    return "articles:" + params.json(sort_keys=True)
+
+
+def articles_tags(params: ListArticlesQuery) -> list[str]:
+    if params.tag is None and params.author is None and params.favorited_by is None:
+        return [ARTICLES, ALL_ARTICLES]
+
+    tags = [ARTICLES]
+    if params.tag is not None:
+        tags.append(_tag_tag(params.tag))
+    if params.author is not None:
+        tags.append(_author_tag(params.author))
+    # Any favorite changes the count shown in every favorited list the article is in, not only the favoriter's
+    if params.favorited_by is not None:
+        tags.append(FAVORITED_ARTICLES)
+    return tags
+
+
+def comments_key(slug: str, params: ListCommentsQuery, *, etag: str) -> str:
+    # Keyed by the ETag sent with the body, so that a body cached before a change is never sent under the new ETag
+    return f"comments:{slug}:{etag}:" + params.json(sort_keys=True)
+
+
+def comments_tags(slug: str) -> list[str]:
+    return [COMMENTS, _comments_tag(slug)]
+
+
+async def invalidate_article(
+    *, author: str, tag_list: Iterable[str], in_favorited_lists: bool = True, tags_changed: bool = False
+) -> None:
+    # Drops the lists the article shows up in. A new article can't be favorited yet.
+    tags = [ALL_ARTICLES, _author_tag(author), *(_tag_tag(tag) for tag in tag_list)]
+    if in_favorited_lists:
+        tags.append(FAVORITED_ARTICLES)
+    if tags_changed:
+        tags.append(TAGS)
+    await response_cache.invalidate(*tags)
+
+
+async def invalidate_comments(*, slug: str) -> None:
+    await response_cache.invalidate(_comments_tag(slug))
+
+
+async def invalidate_profiles() -> None:
+    # Profiles are embedded in every article and comment listed
+    await response_cache.invalidate(ARTICLES, COMMENTS)
+
+
+async def invalidate_all() -> None:
+    await response_cache.invalidate(ARTICLES, COMMENTS, TAGS)
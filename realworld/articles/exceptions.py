@@ -37,6 +37,14 @@ class ArticleDeleteNotPermittedError(ApiError):
         )
 
 
+class InvalidArticleFieldsError(ApiError):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail={"fields": ["is invalid"]},
+        )
+
+
 class ArticleCommentNotFoundError(ApiError):
     def __init__(self) -> None:
         super().__init__(
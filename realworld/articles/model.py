@@ -2,16 +2,55 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, Uuid, func, select
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    CheckConstraint,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Uuid,
+    func,
+    select,
+    text,
+)
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import mapped_column
 
 from realworld.database.core import Base, DbSession
 
 
+SEARCH_LANGUAGE = "english"
+# Matches in the title rank above matches in the description, which rank above matches in the body
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_LANGUAGE}', title), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_LANGUAGE}', description), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_LANGUAGE}', body), 'C')"
+)
+
+
 class RealWorldArticle(Base):
     __tablename__ = "article"
-    __table_args__ = (Index("ix_article_tags_gin", "tag_list", postgresql_using="gin"),)
+    __table_args__ = (
+        Index("ix_article_tags_gin", "tag_list", postgresql_using="gin"),
+        # Backs keyset pagination over (created_at, id)
+        Index("ix_article_created_at_id", "created_at", "id"),
+        Index("ix_article_user_id_created_at", "user_id", "created_at", "id"),
+        # Backs merging the articles that weren't fanned out into feeds
+        Index(
+            "ix_article_user_id_created_at_pulled",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_where=text("NOT fanned_out"),
+        ),
+        Index("ix_article_search_vector_gin", "search_vector", postgresql_using="gin"),
+        # Backs incremental exports, which read everything changed since the previous one in that order
+        Index("ix_article_changed_at_id", "changed_at", "id"),
+    )
     id = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     user_id = mapped_column(Uuid, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
     # Slug is the title of the article in lowercase and hyphenated, it must be unique here because
@@ -21,8 +60,23 @@ class RealWorldArticle(Base):
     description = mapped_column(String, nullable=False)
     body = mapped_column(String, nullable=False)
     tag_list = mapped_column(postgresql.ARRAY(String, dimensions=1), nullable=False)
+    # Denormalized count of article_favorite rows, kept in sync by the favorite/unfavorite service functions
+    favorites_count = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Whether the article was copied into the feeds of its author's followers. It isn't when the author had too many
+    # followers at the time, then it's merged into feeds on read, whatever the author's count is later.
+    fanned_out = mapped_column(Boolean, nullable=False, default=False, server_default="false")
     created_at = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = mapped_column(DateTime(timezone=True), nullable=False, onupdate=func.now(), server_default=func.now())
+    # When anything exported about the article last changed, including its favorites count, which keeps updated_at.
+    # Updates that change nothing exported keep it too.
+    changed_at = mapped_column(DateTime(timezone=True), nullable=False, onupdate=func.now(), server_default=func.now())
+    # Full-text search document, maintained by Postgres. It's only used in queries, so it's never loaded.
+    search_vector = mapped_column(
+        postgresql.TSVECTOR,
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        nullable=False,
+        deferred=True,
+    )
 
     @staticmethod
     async def by_id(db: DbSession, article_id: uuid.UUID) -> RealWorldArticle | None:
@@ -35,6 +89,8 @@ class RealWorldArticle(Base):
 
 class ArticleFavorite(Base):
     __tablename__ = "article_favorite"
+    # The primary key starts with article_id, this backs looking up the favorites of a user
+    __table_args__ = (Index("ix_article_favorite_user_id_article_id", "user_id", "article_id"),)
     article_id = mapped_column(
         Uuid,
         ForeignKey("article.id", ondelete="CASCADE"),
@@ -48,11 +104,48 @@ class ArticleFavorite(Base):
 
 class ArticleComment(Base):
     __tablename__ = "article_comment"
+    # Backs keyset pagination of the comments of an article
+    __table_args__ = (
+        Index("ix_article_comment_article_id_created_at", "article_id", "created_at", "id"),
+        Index("ix_article_comment_updated_at_id", "updated_at", "id"),
+    )
     # I would just use a UUID here but the RealWorld spec uses an integer.
     # The id should not be used to sort comments, so I'll use created_at instead.
     id = mapped_column(BigInteger, primary_key=True)
-    article_id = mapped_column(Uuid, ForeignKey("article.id", ondelete="CASCADE"), nullable=False, index=True)
+    article_id = mapped_column(Uuid, ForeignKey("article.id", ondelete="CASCADE"), nullable=False)
     user_id = mapped_column(Uuid, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
     body = mapped_column(String, nullable=False)
     created_at = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
     updated_at = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+
+class ArticlesCount(Base):
+    # Denormalized count of all articles, in a single row kept in sync by create_article and delete_article, so that
+    # the unfiltered list doesn't count the whole table for its total
+    __tablename__ = "articles_count"
+    __table_args__ = (CheckConstraint("id = 1", name="ck_articles_count_single_row"),)
+    id = mapped_column(Integer, primary_key=True, default=1)
+    count = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+class Tag(Base):
+    __tablename__ = "tag"
+    name = mapped_column(String, primary_key=True)
+    # Denormalized count of article_tag rows, kept in sync by the article service functions
+    articles_count = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+# Backs listing the most used tags first
+Index("ix_tag_articles_count_name", Tag.articles_count.desc(), Tag.name)
+
+
+class ArticleTag(Base):
+    __tablename__ = "article_tag"
+    __table_args__ = (Index("ix_article_tag_tag_name_article_id", "tag_name", "article_id"),)
+    article_id = mapped_column(
+        Uuid,
+        ForeignKey("article.id", ondelete="CASCADE"),
+        nullable=False,
+        primary_key=True,
+    )
+    tag_name = mapped_column(String, ForeignKey("tag.name", ondelete="CASCADE"), nullable=False, primary_key=True)
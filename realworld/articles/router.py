@@ -1,9 +1,10 @@
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Response
 from sqlalchemy.exc import IntegrityError
 
+from realworld.articles import cache
 from realworld.articles.exceptions import (
     ArticleCommentNotFoundError,
     ArticleCouldNotBeUpdatedError,
@@ -12,10 +13,13 @@ from realworld.articles.exceptions import (
     ArticleTitleAlreadyExistsError,
     AuthorNotFoundError,
 )
-from realworld.articles.model import RealWorldArticle
-from realworld.database.core import DbSession
-from realworld.profiles import service as profile_service
+from realworld.database.core import DbSession, ReadDbSession, sessionmaker
+from realworld.etags import etag_matches, not_modified
+from realworld.feed import service as feed_service
+from realworld.loaders import RequestLoaders
 from realworld.profiles.schema import Profile
+from realworld.response_cache import cached_json_response, response_cache
+from realworld.responses import json_response, render_json
 from realworld.users.dependencies import get_current_user, maybe_get_current_user
 from realworld.users.schema import AuthUser
 
@@ -27,8 +31,10 @@ from .schema import (
     Comment,
     CommentCreate,
     ListArticlesQuery,
+    ListCommentsQuery,
     MultipleArticlesBody,
     MultipleCommentsBody,
+    SearchArticlesQuery,
     SingleArticleBody,
     SingleCommentBody,
     TagsBody,
@@ -42,12 +48,24 @@ router = APIRouter()
 # https://www.realworld.how/docs/specs/backend-specs/endpoints/#feed-articles
 @router.get("/articles/feed", response_model=MultipleArticlesBody)
 async def get_feed_articles(
-    db: DbSession,
+    db: ReadDbSession,
     query: ListArticlesQuery = Depends(),
     current_user: AuthUser = Depends(get_current_user),
-) -> MultipleArticlesBody:
-    articles = await service.get_feed_articles(db, params=query, current_user=current_user)
-    return MultipleArticlesBody(articles=articles or [], articles_count=len(articles or []))
+) -> MultipleArticlesBody | Response:
+    return json_response(
+        await service.get_feed_articles(db, params=query, current_user=current_user),
+        partial=service.article_fields(query) is not None,
+    )
+
+
+# Not part of the spec. Declared before /articles/{slug} so that "search" isn't taken for a slug.
+@router.get("/articles/search", response_model=MultipleArticlesBody)
+async def search_articles(
+    db: ReadDbSession,
+    query: SearchArticlesQuery = Depends(),
+    current_user: AuthUser | None = Depends(maybe_get_current_user),
+) -> MultipleArticlesBody | Response:
+    return json_response(await service.search_articles(db, params=query, current_user=current_user))
 
 
 # https://www.realworld.how/docs/specs/backend-specs/endpoints/#create-article
@@ -55,6 +73,7 @@ async def get_feed_articles(
 async def create_article(
     db: DbSession,
     body: SingleArticleBody[ArticleCreate],
+    background_tasks: BackgroundTasks,
     current_user: AuthUser = Depends(get_current_user),
 ) -> SingleArticleBody[Article]:
     if body.article.tag_list is not None:
@@ -65,11 +84,12 @@ async def create_article(
     except IntegrityError:
         raise ArticleTitleAlreadyExistsError() from None
 
+    background_tasks.add_task(feed_service.fan_out_article_in_background, article.id)
+
     return SingleArticleBody(
         article=Article(
             **article.dict(),
             favorited=False,
-            favorites_count=0,
             author=Profile.from_user(current_user),
         )
     )
@@ -78,28 +98,30 @@ async def create_article(
 # https://www.realworld.how/docs/specs/backend-specs/endpoints/#get-article
 @router.get("/articles/{slug}", response_model=SingleArticleBody[Article])
 async def get_article(
-    db: DbSession,
+    db: ReadDbSession,
     slug: str,
+    response: Response,
     current_user: Annotated[AuthUser, Depends(maybe_get_current_user)],
-) -> SingleArticleBody[Article]:
-    if (article := await RealWorldArticle.by_slug(db, slug)) is None:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> SingleArticleBody[Article] | Response:
+    if (validator := await service.get_article_validator(db, slug=slug, current_user=current_user)) is None:
         raise ArticleNotFoundError()
 
-    if (author := await profile_service.get_profile(db, identifier=article.user_id, current_user=current_user)) is None:
-        raise AuthorNotFoundError()
+    if etag_matches(if_none_match, validator.etag):
+        return not_modified(validator.etag)
 
-    favorited = (
-        await service.is_article_favorited_by_user(db, article_id=article.id, user=current_user)
-        if current_user is not None
-        else False
-    )
+    if (article := await RequestLoaders.of(db).articles_by_slug.load(slug)) is None:
+        raise ArticleNotFoundError()
+
+    if (author := await RequestLoaders.of(db).users_by_id.load(article.user_id)) is None:
+        raise AuthorNotFoundError()
 
+    response.headers["ETag"] = validator.etag
     return SingleArticleBody(
         article=Article(
             **article.dict(),
-            favorited=favorited,
-            favorites_count=await service.get_article_favorites_count(db, article_id=article.id),
-            author=author,
+            favorited=validator.favorited,
+            author=Profile(**author.dict(), following=validator.following),
         )
     )
 
@@ -112,7 +134,7 @@ async def update_article(
     body: SingleArticleBody[ArticleUpdate],
     current_user: AuthUser = Depends(get_current_user),
 ) -> SingleArticleBody[Article]:
-    if (_ := await RealWorldArticle.by_slug(db, slug)) is None:
+    if (_ := await RequestLoaders.of(db).articles_by_slug.load(slug)) is None:
         raise ArticleNotFoundError()
 
     try:
@@ -127,7 +149,6 @@ async def update_article(
         article=Article(
             **article.dict(),
             favorited=False,
-            favorites_count=await service.get_article_favorites_count(db, article_id=article.id),
             author=Profile.from_user(current_user),
         )
     )
@@ -149,12 +170,29 @@ async def delete_article(
 # https://www.realworld.how/docs/specs/backend-specs/endpoints/#list-articles
 @router.get("/articles", response_model=MultipleArticlesBody)
 async def list_articles(
-    db: DbSession,
+    db: ReadDbSession,
     query: ListArticlesQuery = Depends(),
     current_user: AuthUser | None = Depends(maybe_get_current_user),
-) -> MultipleArticlesBody:
-    articles = await service.get_articles(db, params=query, current_user=current_user)
-    return MultipleArticlesBody(articles=articles or [], articles_count=len(articles or []))
+) -> MultipleArticlesBody | Response:
+    # Anonymous lists are the same for everyone, so they're shared through the response cache
+    if current_user is None:
+        body = await response_cache.get_or_compute(
+            cache.articles_key(query), tags=cache.articles_tags(query), compute=lambda: _render_articles(query)
+        )
+        return cached_json_response(body)
+
+    return json_response(
+        await service.get_articles(db, params=query, current_user=current_user),
+        partial=service.article_fields(query) is not None,
+    )
+
+
+async def _render_articles(query: ListArticlesQuery) -> bytes:
+    # Might be refreshing a stale entry after the request is done, so it can't use the request's session.
+    # Entries are recomputed right after writes invalidate them, when a replica might not have the write yet,
+    # so they're read from the primary.
+    async with sessionmaker() as db:
+        return render_json(await service.get_articles(db, params=query, current_user=None))
 
 
 # https://www.realworld.how/docs/specs/backend-specs/endpoints/#favorite-article
@@ -187,8 +225,15 @@ async def unfavorite_article(
 
 # https://www.realworld.how/docs/specs/backend-specs/endpoints/#get-tags
 @router.get("/tags", response_model=TagsBody)
-async def get_tags(db: DbSession) -> TagsBody:
-    return TagsBody(tags=await service.get_tags(db))
+async def get_tags() -> Response:
+    return cached_json_response(
+        await response_cache.get_or_compute(cache.TAGS, tags=[cache.TAGS], compute=_render_tags)
+    )
+
+
+async def _render_tags() -> bytes:
+    async with sessionmaker() as db:
+        return render_json(TagsBody(tags=await service.get_tags(db)))
 
 
 # https://www.realworld.how/docs/specs/backend-specs/endpoints/#add-comments-to-an-article
@@ -221,9 +266,35 @@ async def delete_article_comment(
 # https://www.realworld.how/docs/specs/backend-specs/endpoints/#get-comments-from-an-article
 @router.get("/articles/{slug}/comments", response_model=MultipleCommentsBody)
 async def get_comments(
-    db: DbSession,
+    db: ReadDbSession,
     slug: str,
+    response: Response,
+    query: ListCommentsQuery = Depends(),
+    if_none_match: Annotated[str | None, Header()] = None,
     current_user: AuthUser | None = Depends(maybe_get_current_user),
-) -> MultipleCommentsBody:
-    comments = await service.get_comments(db, slug=slug, current_user=current_user)
-    return MultipleCommentsBody(comments=comments)
+) -> MultipleCommentsBody | Response:
+    etag = await service.get_comments_etag(db, slug=slug, params=query, current_user=current_user)
+    headers = {}
+    if etag is not None:
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        response.headers["ETag"] = etag
+        headers["ETag"] = etag
+
+        if current_user is None:
+            body = await response_cache.get_or_compute(
+                cache.comments_key(slug, query, etag=etag),
+                tags=cache.comments_tags(slug),
+                compute=lambda: _render_comments(slug, query),
+            )
+            return cached_json_response(body, headers=headers)
+
+    return json_response(
+        await service.get_comments(db, slug=slug, params=query, current_user=current_user), headers=headers
+    )
+
+
+async def _render_comments(slug: str, query: ListCommentsQuery) -> bytes:
+    async with sessionmaker() as db:
+        return render_json(await service.get_comments(db, slug=slug, params=query, current_user=None))
@@ -28,10 +28,15 @@ class Article(RealWorldBaseModel):
     author: Profile
 
 
+# The fields an article in a list can be narrowed down to with fields=, from their camelCase name
+ARTICLE_FIELDS = {field.alias: name for name, field in Article.__fields__.items()}
+
+
 # https://www.realworld.how/docs/specs/backend-specs/api-response-format/#multiple-articles
 class MultipleArticlesBody(RealWorldBaseModel):
     articles: list[Article]
     articles_count: int
+    next_cursor: str | None = None
 
 
 class ArticleCreate(RealWorldBaseModel):
@@ -52,8 +57,18 @@ class ListArticlesQuery(RealWorldBaseModel):
     tag: str | None = None
     author: str | None = None
     favorited_by: str | None = Field(None, alias="favorited")
-    limit: int = 20
-    offset: int = 0
+    limit: int = Field(20, ge=1)
+    offset: int = Field(0, ge=0)
+    # Keyset pagination, takes precedence over offset when set
+    cursor: str | None = None
+    # Comma separated camelCase names of the article fields to return, e.g. fields=slug,title,author
+    fields: str | None = None
+
+
+class SearchArticlesQuery(RealWorldBaseModel):
+    q: str = Field(min_length=1)
+    limit: int = Field(20, ge=1, le=100)
+    cursor: str | None = None
 
 
 class Comment(RealWorldBaseModel):
@@ -74,7 +89,48 @@ class SingleCommentBody(GenericModel, Generic[T]):
 
 class MultipleCommentsBody(RealWorldBaseModel):
     comments: list[Comment]
+    next_cursor: str | None = None
+
+
+class ListCommentsQuery(RealWorldBaseModel):
+    limit: int = Field(100, ge=1)
+    cursor: str | None = None
 
 
 class TagsBody(RealWorldBaseModel):
     tags: list[str]
+
+
+# Exports have one object per line. They leave out what depends on who's asking, like favorited and following.
+class ExportedAuthor(RealWorldBaseModel):
+    username: str
+    bio: str
+    image: str | None = None
+
+
+class ExportedArticle(RealWorldBaseModel):
+    slug: str
+    title: str
+    description: str
+    body: str
+    tag_list: list[str]
+    created_at: datetime
+    updated_at: datetime
+    # Where the next incremental export starts, it also moves when the favorites count changes
+    changed_at: datetime
+    favorites_count: int
+    author: ExportedAuthor
+
+
+class ExportedComment(RealWorldBaseModel):
+    id: int
+    article_slug: str
+    body: str
+    created_at: datetime
+    updated_at: datetime
+    author: ExportedAuthor
+
+
+class ExportQuery(RealWorldBaseModel):
+    # Only what was created or changed at or after this time, for incremental exports
+    updated_since: datetime | None = None
@@ -1,49 +1,199 @@
 import logging
 import uuid
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any, NamedTuple
 
 import sqlalchemy
 from slugify import slugify
-from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy import SQLColumnExpression, cast, delete, exists, func, insert, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.dialects.postgresql import insert as psql_insert
-
-from realworld.articles.model import ArticleComment, ArticleFavorite, RealWorldArticle
+from sqlalchemy.orm import aliased, load_only
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from realworld import config
+from realworld.articles import cache
+from realworld.articles.exceptions import InvalidArticleFieldsError
+from realworld.articles.model import (
+    SEARCH_LANGUAGE,
+    ArticleComment,
+    ArticleFavorite,
+    ArticlesCount,
+    ArticleTag,
+    RealWorldArticle,
+    Tag,
+)
 from realworld.articles.schema import (
+    ARTICLE_FIELDS,
     Article,
     ArticleCreate,
     ArticleUpdate,
     Comment,
+    ExportedArticle,
+    ExportedAuthor,
+    ExportedComment,
     ListArticlesQuery,
+    ListCommentsQuery,
+    MultipleArticlesBody,
+    MultipleCommentsBody,
+    SearchArticlesQuery,
 )
-from realworld.database.core import DbSession
+from realworld.database.core import DbSession, rowcount
+from realworld.etags import make_etag
+from realworld.feed import service as feed_service
+from realworld.feed.cache import feed_count_cache
+from realworld.loaders import RequestLoaders
+from realworld.pagination import decode_cursor, encode_cursor
 from realworld.profiles import service as profile_service
 from realworld.profiles.model import Follow
 from realworld.profiles.schema import Profile
+from realworld.responses import render_json
 from realworld.users.model import RealWorldUser
-from realworld.users.schema import AuthUser, User
+from realworld.users.schema import AuthUser
 
 logger = logging.getLogger(__name__)
 
 
+async def _add_article_tags(db: DbSession, *, article_id: uuid.UUID, tag_list: list[str]) -> None:
+    # Sorted so that concurrent writers lock the tag rows in the same order
+    tag_names = sorted(set(tag_list))
+    if not tag_names:
+        return
+
+    upsert = psql_insert(Tag).values([{"name": name, "articles_count": 1} for name in tag_names])
+    await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[Tag.name],
+            set_={"articles_count": Tag.articles_count + 1},
+        )
+    )
+    await db.execute(insert(ArticleTag).values([{"article_id": article_id, "tag_name": name} for name in tag_names]))
+
+
+async def _remove_article_tags(db: DbSession, *, tag_list: list[str]) -> None:
+    # The article_tag rows themselves are removed by the cascade from article
+    tag_names = sorted(set(tag_list))
+    if not tag_names:
+        return
+
+    await db.execute(
+        update(Tag)
+        .where(Tag.name.in_(tag_names))
+        .values(articles_count=Tag.articles_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _add_to_articles_count(db: DbSession, *, delta: int) -> None:
+    # Concurrent writers wait on the one row until they commit, articles are created rarely enough for that
+    await db.execute(update(ArticlesCount).values(count=ArticlesCount.count + delta))
+
+
 async def create_article(db: DbSession, *, article_in: ArticleCreate, user: AuthUser) -> RealWorldArticle:
-    article = RealWorldArticle(user_id=user.user_id, slug=slugify(article_in.title), **article_in.dict())
+    article = RealWorldArticle(
+        user_id=user.user_id,
+        slug=slugify(article_in.title),
+        **article_in.dict(exclude={"tag_list"}),
+        tag_list=article_in.tag_list or [],
+    )
     db.add(article)
+    await db.flush()
+    await _add_article_tags(db, article_id=article.id, tag_list=article.tag_list)
+    await _add_to_articles_count(db, delta=1)
     await db.commit()
+    await cache.invalidate_article(
+        author=user.username, tag_list=article.tag_list, in_favorited_lists=False, tags_changed=True
+    )
     await db.refresh(article)
     return article
 
 
-async def is_article_favorited_by_user(db: DbSession, *, article_id: uuid.UUID, user: AuthUser) -> bool:
-    article = await db.scalar(
-        select(RealWorldArticle).where(RealWorldArticle.id == article_id).where(ArticleFavorite.user_id == user.user_id)
-    )
-    return article is not None
+async def enrich_articles(
+    db: DbSession,
+    *,
+    rows: Sequence[tuple[RealWorldArticle, RealWorldUser]],
+    current_user: AuthUser | None,
+    fields: frozenset[str] | None = None,
+) -> list[Article]:
+    # Viewer-dependent fields are resolved for the whole page at once, with one query each
+    favorited_article_ids: set[uuid.UUID] = set()
+    followed_author_ids: set[uuid.UUID] = set()
+    if current_user is not None and rows:
+        if fields is None or "favorited" in fields:
+            favorited_article_ids = set(
+                await db.scalars(
+                    select(ArticleFavorite.article_id)
+                    .where(ArticleFavorite.user_id == current_user.user_id)
+                    .where(ArticleFavorite.article_id.in_([article.id for article, _ in rows]))
+                )
+            )
+        if fields is None or "author" in fields:
+            followed_author_ids = await profile_service.get_followed_user_ids(
+                db, user_ids={author.id for _, author in rows}, current_user=current_user
+            )
 
+    if fields is None:
+        return [
+            Article(
+                **article.dict(),
+                favorited=article.id in favorited_article_ids,
+                author=Profile(**author.dict(), following=author.id in followed_author_ids),
+            )
+            for article, author in rows
+        ]
+
+    # Sparse articles only have the requested fields set, so they can't be validated
+    articles = []
+    for article, author in rows:
+        values = {name: value for name, value in article.dict().items() if name in fields}
+        if "favorited" in fields:
+            values["favorited"] = article.id in favorited_article_ids
+        if "author" in fields:
+            values["author"] = Profile(**author.dict(), following=author.id in followed_author_ids)
+        articles.append(Article.construct(**values))
+    return articles
+
+
+class ArticleValidator(NamedTuple):
+    etag: str
+    # For the current user, False without one
+    favorited: bool
+    following: bool
+
+
+async def get_article_validator(db: DbSession, *, slug: str, current_user: AuthUser | None) -> ArticleValidator | None:
+    # Everything a single article response depends on, in one cheap query. The viewer's flags are returned along with
+    # the ETag so that a full response doesn't look them up again.
+    columns: list[SQLColumnExpression[Any]] = [
+        RealWorldArticle.id,
+        RealWorldArticle.updated_at,
+        RealWorldArticle.favorites_count,
+        RealWorldUser.updated_at,
+    ]
+    if current_user is not None:
+        columns += [
+            exists()
+            .where(ArticleFavorite.article_id == RealWorldArticle.id)
+            .where(ArticleFavorite.user_id == current_user.user_id),
+            exists()
+            .where(Follow.followed_user_id == RealWorldArticle.user_id)
+            .where(Follow.following_user_id == current_user.user_id),
+        ]
+
+    row = (
+        await db.execute(
+            select(*columns)
+            .join(RealWorldUser, RealWorldUser.id == RealWorldArticle.user_id)
+            .where(RealWorldArticle.slug == slug)
+        )
+    ).first()
+    if row is None:
+        return None
 
-async def get_article_favorites_count(db: DbSession, *, article_id: uuid.UUID) -> int:
-    count = await db.scalar(
-        select(func.count(ArticleFavorite.article_id)).where(ArticleFavorite.article_id == article_id)
-    )
-    return count or 0
+    favorited, following = row[4:] if current_user is not None else (False, False)
+    return ArticleValidator(etag=make_etag("article", *row), favorited=favorited, following=following)
 
 
 async def update_article(
@@ -58,104 +208,243 @@ async def update_article(
     )
 
     await db.commit()
+    if article is None:
+        return None
+
+    await cache.invalidate_article(author=user.username, tag_list=article.tag_list)
     await db.refresh(article)
-    return article or None
+    return article
 
 
 async def delete_article(db: DbSession, *, slug: str, user: AuthUser) -> None:
-    await db.execute(
-        delete(RealWorldArticle).where(RealWorldArticle.slug == slug).where(RealWorldArticle.user_id == user.user_id)
+    tag_list = await db.scalar(
+        delete(RealWorldArticle)
+        .where(RealWorldArticle.slug == slug)
+        .where(RealWorldArticle.user_id == user.user_id)
+        .returning(RealWorldArticle.tag_list)
     )
+    if tag_list is not None:
+        await _remove_article_tags(db, tag_list=tag_list)
+        await _add_to_articles_count(db, delta=-1)
+
     await db.commit()
+    if tag_list is not None:
+        await cache.invalidate_article(author=user.username, tag_list=tag_list, tags_changed=True)
+        await cache.invalidate_comments(slug=slug)
 
 
-async def build_filter_query(
-    db: DbSession,
-    *,
-    stmt: sqlalchemy.sql.Select,
-    params: ListArticlesQuery,
-) -> sqlalchemy.sql.Select:
-    # Filter articles by tag
+def build_filter_query(stmt: sqlalchemy.sql.Select, *, params: ListArticlesQuery) -> sqlalchemy.sql.Select:
+    # Every filter goes into the one statement, for lists and feeds alike. Usernames are matched in the statement
+    # rather than looked up beforehand, so an unknown author or favoriter matches no articles.
     if params.tag is not None:
-        query = stmt.where(RealWorldArticle.tag_list.contains([params.tag]))
-
-    # Filter articles by author
-    if params.author is not None:
-        author = await RealWorldUser.by_username(db, params.author)
-        if author is not None:
-            query = stmt.where(RealWorldArticle.user_id == author.id)
+        # tag_list @> ARRAY[tag], answered by the GIN index on tag_list
+        stmt = stmt.where(RealWorldArticle.tag_list.contains([params.tag]))
 
-    # Filter articles favorited by some user
     if params.favorited_by is not None:
-        user = await RealWorldUser.by_username(db, params.favorited_by)
-        if user is not None:
-            query = stmt.join(ArticleFavorite, ArticleFavorite.article_id == RealWorldArticle.id).where(
-                ArticleFavorite.user_id == user.id
+        favoriter = aliased(RealWorldUser)
+        stmt = stmt.where(
+            RealWorldArticle.id.in_(
+                select(ArticleFavorite.article_id)
+                .join(favoriter, favoriter.id == ArticleFavorite.user_id)
+                .where(favoriter.username == params.favorited_by)
             )
+        )
+
+    # Get the author of each article, filtering on the joined author
+    stmt = stmt.join(RealWorldUser, RealWorldUser.id == RealWorldArticle.user_id)
+    if params.author is not None:
+        stmt = stmt.where(RealWorldUser.username == params.author)
+    return stmt
 
-    # Get the author of each article
-    query = stmt.join(RealWorldUser, RealWorldUser.id == RealWorldArticle.user_id)
-    return query
 
+# Loaded whatever the fields, for favorites, authors and cursors
+_ARTICLE_KEY_COLUMNS = (RealWorldArticle.id, RealWorldArticle.user_id, RealWorldArticle.created_at)
+# favorited and author don't come from the article row
+_ARTICLE_FIELD_COLUMNS = {
+    "slug": RealWorldArticle.slug,
+    "title": RealWorldArticle.title,
+    "description": RealWorldArticle.description,
+    "body": RealWorldArticle.body,
+    "tag_list": RealWorldArticle.tag_list,
+    "updated_at": RealWorldArticle.updated_at,
+    "favorites_count": RealWorldArticle.favorites_count,
+}
+# Only what a profile shows, never the email or password hash
+_AUTHOR_COLUMNS = (RealWorldUser.id, RealWorldUser.username, RealWorldUser.bio, RealWorldUser.image)
 
-async def get_articles(db: DbSession, params: ListArticlesQuery, current_user: AuthUser | None) -> list[Article] | None:
-    stmt = (
-        select(RealWorldArticle, RealWorldUser)
-        .order_by(RealWorldArticle.created_at.desc())
-        .offset(min(params.offset, 100))
-        .limit(min(params.limit, 100))
+
+def article_fields(params: ListArticlesQuery) -> frozenset[str] | None:
+    # The article fields a list returns, None meaning all of them
+    if params.fields is None:
+        return None if config.ARTICLES_LIST_INCLUDE_BODY else frozenset(ARTICLE_FIELDS.values()) - {"body"}
+
+    aliases = {alias.strip() for alias in params.fields.split(",")} - {""}
+    if not aliases or not aliases <= ARTICLE_FIELDS.keys():
+        raise InvalidArticleFieldsError()
+    return frozenset(ARTICLE_FIELDS[alias] for alias in aliases)
+
+
+def article_list_load_options(fields: frozenset[str] | None) -> list[LoaderOption]:
+    # Selects only the columns backing the returned fields, which keeps large bodies in TOAST
+    names = fields if fields is not None else _ARTICLE_FIELD_COLUMNS.keys()
+    columns = [column for name, column in _ARTICLE_FIELD_COLUMNS.items() if name in names]
+    return [load_only(*_ARTICLE_KEY_COLUMNS, *columns), load_only(*_AUTHOR_COLUMNS)]
+
+
+def decode_article_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    created_at, article_id = decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+    return created_at, article_id
+
+
+def paginate_articles(stmt: sqlalchemy.sql.Select, params: ListArticlesQuery) -> sqlalchemy.sql.Select:
+    # One extra row is fetched to know whether there is a next page
+    stmt = stmt.order_by(RealWorldArticle.created_at.desc(), RealWorldArticle.id.desc()).limit(
+        min(params.limit, 100) + 1
     )
 
-    query = await build_filter_query(db, stmt=stmt, params=params)
-
-    results = await db.execute(query)
-    return [
-        Article(
-            **article.dict(),
-            favorited=current_user is not None
-            and await is_article_favorited_by_user(db, article_id=article.id, user=current_user),
-            favorites_count=await get_article_favorites_count(db, article_id=article.id),
-            author=Profile(
-                **author.dict(),
-                following=current_user is not None
-                and await profile_service.is_following(db, username=author.username, current_user=current_user),
-            ),
+    if params.cursor is not None:
+        created_at, article_id = decode_article_cursor(params.cursor)
+        return stmt.where(
+            tuple_(RealWorldArticle.created_at, RealWorldArticle.id) < tuple_(literal(created_at), literal(article_id))
         )
-        for article, author in results.tuples()
-    ]
 
+    return stmt.offset(params.offset)
 
-async def get_feed_articles(db: DbSession, params: ListArticlesQuery, current_user: AuthUser) -> list[Article] | None:
-    stmt = (
-        select(RealWorldArticle, RealWorldUser)
-        .where(Follow.following_user_id == current_user.user_id)
-        .where(Follow.followed_user_id == RealWorldArticle.user_id)
-        .order_by(RealWorldArticle.created_at.desc())
-        .offset(min(params.offset, 100))
-        .limit(min(params.limit, 100))
+
+async def count_articles(db: DbSession, *, filtered: sqlalchemy.sql.Select) -> int:
+    count = await db.scalar(filtered.with_only_columns(func.count(), maintain_column_froms=True).order_by(None))
+    return count or 0
+
+
+async def get_articles_page(
+    db: DbSession,
+    *,
+    stmt: sqlalchemy.sql.Select,
+    params: ListArticlesQuery,
+    current_user: AuthUser | None,
+    is_global_list: bool = False,
+    articles_count: int | None = None,
+) -> MultipleArticlesBody:
+    # articles_count is for when stmt is already narrowed down to the page and can't be used to count the total
+    fields = article_fields(params)
+    filtered = build_filter_query(stmt, params=params)
+    query = paginate_articles(filtered, params).options(*article_list_load_options(fields))
+
+    # The total is a column of the page query where possible. The unfiltered list reads it from the counter row,
+    # a window count there would read the whole table before the limit. Filtered offset pages count their matches
+    # with a window count, cursor pages can't because the cursor condition narrows the window.
+    total: sqlalchemy.sql.ColumnElement[int] | None = None
+    if is_global_list:
+        total = select(ArticlesCount.count).scalar_subquery()
+    elif params.cursor is None and articles_count is None:
+        total = func.count().over()
+    if total is not None:
+        query = query.add_columns(total)
+
+    rows = (await db.execute(query)).all()
+
+    if articles_count is None:
+        if total is not None and rows:
+            articles_count = rows[0][2]
+        elif is_global_list:
+            articles_count = await db.scalar(select(ArticlesCount.count)) or 0
+        elif total is not None and params.offset == 0:
+            articles_count = 0
+        else:
+            articles_count = await count_articles(db, filtered=filtered)
+
+    page = [(article, author) for article, author, *_ in rows]
+    limit = min(params.limit, 100)
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last_article, _ = page[-1]
+        next_cursor = encode_cursor(last_article.created_at, last_article.id)
+
+    articles = await enrich_articles(db, rows=page, current_user=current_user, fields=fields)
+    return MultipleArticlesBody(articles=articles, articles_count=articles_count, next_cursor=next_cursor)
+
+
+async def get_articles(db: DbSession, params: ListArticlesQuery, current_user: AuthUser | None) -> MultipleArticlesBody:
+    stmt = select(RealWorldArticle, RealWorldUser)
+    is_global_list = params.tag is None and params.author is None and params.favorited_by is None
+    return await get_articles_page(
+        db, stmt=stmt, params=params, current_user=current_user, is_global_list=is_global_list
     )
 
-    query = await build_filter_query(db, stmt=stmt, params=params)
-
-    results = await db.execute(query)
-    return [
-        Article(
-            **article.dict(),
-            favorited=current_user is not None
-            and await is_article_favorited_by_user(db, article_id=article.id, user=current_user),
-            favorites_count=await get_article_favorites_count(db, article_id=article.id),
-            author=Profile(
-                **author.dict(),
-                following=current_user is not None
-                and await profile_service.is_following(db, username=author.username, current_user=current_user),
-            ),
+
+async def get_feed_articles(db: DbSession, params: ListArticlesQuery, current_user: AuthUser) -> MultipleArticlesBody:
+    def articles_in(entries: sqlalchemy.sql.CompoundSelect) -> sqlalchemy.sql.Select:
+        feed = entries.subquery()
+        return select(RealWorldArticle, RealWorldUser).join(feed, feed.c.article_id == RealWorldArticle.id)
+
+    all_entries = feed_service.feed_entries(current_user.id)
+    if params.tag is not None or params.author is not None or params.favorited_by is not None:
+        # Filters apply to articles, so the feed can't be narrowed down to the page before they're joined
+        return await get_articles_page(db, stmt=articles_in(all_entries), params=params, current_user=current_user)
+
+    limit = min(params.limit, 100) + 1
+    if params.cursor is not None:
+        page_entries = feed_service.feed_entries(
+            current_user.id, before=decode_article_cursor(params.cursor), limit=limit
         )
-        for article, author in results.tuples()
-    ]
+    else:
+        page_entries = feed_service.feed_entries(current_user.id, limit=params.offset + limit)
+
+    # Counting the whole feed would read all of it on every poll, the count is cached for a while instead
+    if (articles_count := feed_count_cache.get(current_user.id)) is None:
+        articles_count = await count_articles(db, filtered=build_filter_query(articles_in(all_entries), params=params))
+        feed_count_cache.set(current_user.id, articles_count)
+
+    return await get_articles_page(
+        db,
+        stmt=articles_in(page_entries),
+        params=params,
+        current_user=current_user,
+        articles_count=articles_count,
+    )
+
+
+async def search_articles(
+    db: DbSession, *, params: SearchArticlesQuery, current_user: AuthUser | None
+) -> MultipleArticlesBody:
+    search_query = func.websearch_to_tsquery(cast(SEARCH_LANGUAGE, postgresql.REGCONFIG), params.q)
+    rank = func.ts_rank(RealWorldArticle.search_vector, search_query)
+    matching = (
+        select(RealWorldArticle, RealWorldUser, rank)
+        .join(RealWorldUser, RealWorldUser.id == RealWorldArticle.user_id)
+        .where(RealWorldArticle.search_vector.bool_op("@@")(search_query))
+    )
+
+    # Best matches first, one extra row is fetched to know whether there is a next page
+    query = matching.order_by(rank.desc(), RealWorldArticle.id.desc()).limit(params.limit + 1)
+    if params.cursor is not None:
+        cursor_rank, article_id = decode_cursor(params.cursor, float, uuid.UUID)
+        query = query.where(tuple_(rank, RealWorldArticle.id) < tuple_(cursor_rank, article_id))
+    else:
+        query = query.add_columns(func.count().over())
+
+    rows = (await db.execute(query)).all()
+
+    if params.cursor is None:
+        articles_count = rows[0][3] if rows else 0
+    else:
+        articles_count = await count_articles(db, filtered=matching)
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        next_cursor = encode_cursor(rows[-1][2], rows[-1][0].id)
+
+    articles = await enrich_articles(
+        db, rows=[(article, author) for article, author, *_ in rows], current_user=current_user
+    )
+    return MultipleArticlesBody(articles=articles, articles_count=articles_count, next_cursor=next_cursor)
 
 
 async def add_artcicle_comment(db: DbSession, *, slug: str, body: str, current_user: AuthUser) -> ArticleComment | None:
-    if (article := await RealWorldArticle.by_slug(db, slug)) is None:
+    if (article := await RequestLoaders.of(db).articles_by_slug.load(slug)) is None:
         return None
 
     comment = await db.scalar(
@@ -168,36 +457,100 @@ async def add_artcicle_comment(db: DbSession, *, slug: str, body: str, current_u
         .returning(ArticleComment)
     )
     await db.commit()
+    await cache.invalidate_comments(slug=slug)
     await db.refresh(comment)
     return comment
 
 
-async def get_comments(db: DbSession, *, slug: str, current_user: AuthUser | None) -> list[Comment]:
-    article = await RealWorldArticle.by_slug(db, slug)
+async def get_comments(
+    db: DbSession, *, slug: str, params: ListCommentsQuery, current_user: AuthUser | None
+) -> MultipleCommentsBody:
+    article = await RequestLoaders.of(db).articles_by_slug.load(slug)
     if article is None:
-        return []
+        return MultipleCommentsBody(comments=[])
 
-    results = await db.execute(
+    limit = min(params.limit, 100)
+    # One extra row is fetched to know whether there is a next page
+    stmt = (
         select(ArticleComment, RealWorldUser)
         .join(RealWorldUser, RealWorldUser.id == ArticleComment.user_id)
         .where(ArticleComment.article_id == article.id)
-        .order_by(ArticleComment.created_at.desc())
+        .order_by(ArticleComment.created_at.desc(), ArticleComment.id.desc())
+        .limit(limit + 1)
+    )
+    if params.cursor is not None:
+        created_at, comment_id = decode_cursor(params.cursor, datetime.fromisoformat, int)
+        stmt = stmt.where(tuple_(ArticleComment.created_at, ArticleComment.id) < tuple_(created_at, comment_id))
+
+    rows = (await db.execute(stmt)).tuples().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_comment, _ = rows[-1]
+        next_cursor = encode_cursor(last_comment.created_at, last_comment.id)
+
+    followed_author_ids = (
+        await profile_service.get_followed_user_ids(
+            db, user_ids={author.id for _, author in rows}, current_user=current_user
+        )
+        if current_user is not None
+        else set()
     )
-    return [
+
+    comments = [
         Comment(
             **comment.dict(),
-            author=Profile.from_user(
-                user=User.from_orm(author),
-                following=current_user is not None
-                and await profile_service.is_following(db, username=author.username, current_user=current_user),
-            ),
+            author=Profile(**author.dict(), following=author.id in followed_author_ids),
         )
-        for comment, author in results.tuples()
+        for comment, author in rows
     ]
+    return MultipleCommentsBody(comments=comments, next_cursor=next_cursor)
+
+
+async def get_comments_etag(
+    db: DbSession, *, slug: str, params: ListCommentsQuery, current_user: AuthUser | None
+) -> str | None:
+    # Comments are only ever added or deleted, so their count and latest id/update describe them. The followed authors
+    # among the commenters cover the viewer-dependent part.
+    comments = (
+        select(ArticleComment.user_id)
+        .join(RealWorldArticle, RealWorldArticle.id == ArticleComment.article_id)
+        .where(RealWorldArticle.slug == slug)
+    )
+    columns = [
+        select(RealWorldArticle.id).where(RealWorldArticle.slug == slug).scalar_subquery(),
+        func.count(ArticleComment.id),
+        func.max(ArticleComment.id),
+        func.max(ArticleComment.updated_at),
+        func.max(RealWorldUser.updated_at),
+    ]
+    if current_user is not None:
+        columns.append(
+            select(func.array_agg(aggregate_order_by(Follow.followed_user_id, Follow.followed_user_id)))
+            .where(Follow.following_user_id == current_user.user_id)
+            .where(Follow.followed_user_id.in_(comments))
+            .scalar_subquery()
+        )
+
+    row = (
+        await db.execute(
+            select(*columns)
+            .select_from(ArticleComment)
+            .join(RealWorldArticle, RealWorldArticle.id == ArticleComment.article_id)
+            .join(RealWorldUser, RealWorldUser.id == ArticleComment.user_id)
+            .where(RealWorldArticle.slug == slug)
+        )
+    ).one()
+    article_id, *versions = row
+    if article_id is None:
+        return None
+
+    return make_etag("comments", article_id, params.limit, params.cursor, *versions)
 
 
 async def delete_article_comment(db: DbSession, *, slug: str, comment_id: int, current_user: AuthUser) -> bool:
-    if (article := await RealWorldArticle.by_slug(db, slug)) is None:
+    if (article := await RequestLoaders.of(db).articles_by_slug.load(slug)) is None:
         return False
 
     await db.execute(
@@ -208,68 +561,212 @@ async def delete_article_comment(db: DbSession, *, slug: str, comment_id: int, c
     )
 
     await db.commit()
+    await cache.invalidate_comments(slug=slug)
     return True
 
 
+async def _add_to_favorites_count(db: DbSession, *, article_id: uuid.UUID, delta: int) -> None:
+    # Incrementing in SQL keeps concurrent favorites correct, the row lock serializes them.
+    # populate_existing refreshes the article already loaded in the session with the new count.
+    await db.execute(
+        update(RealWorldArticle)
+        .where(RealWorldArticle.id == article_id)
+        # Favoriting isn't an edit of the article, so updated_at must not change
+        .values(favorites_count=RealWorldArticle.favorites_count + delta, updated_at=RealWorldArticle.updated_at)
+        .returning(RealWorldArticle)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+async def repair_favorites_counts(db: DbSession) -> int:
+    actual_count = (
+        select(func.count())
+        .select_from(ArticleFavorite)
+        .where(ArticleFavorite.article_id == RealWorldArticle.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(RealWorldArticle)
+        .where(RealWorldArticle.favorites_count != actual_count)
+        .values(favorites_count=actual_count, updated_at=RealWorldArticle.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return rowcount(result)
+
+
 async def favorite_article(db: DbSession, *, slug: str, current_user: AuthUser) -> Article | None:
-    if (article := await RealWorldArticle.by_slug(db, slug)) is None:
+    if (article := await RequestLoaders.of(db).articles_by_slug.load(slug)) is None:
         return None
 
-    author = await RealWorldUser.by_id(db, article.user_id)
+    author = await RequestLoaders.of(db).users_by_id.load(article.user_id)
     if author is None:
         return None
 
-    await db.execute(
+    favorited = await db.scalar(
         psql_insert(ArticleFavorite)
         .values(
             article_id=article.id,
             user_id=current_user.user_id,
         )
         .on_conflict_do_nothing()
+        .returning(ArticleFavorite.article_id)
     )
+    # Only count the favorite if it wasn't already there
+    if favorited is not None:
+        await _add_to_favorites_count(db, article_id=article.id, delta=1)
 
     await db.commit()
-    return Article(
-        **article.dict(),
-        favorited=True,
-        favorites_count=await get_article_favorites_count(db, article_id=article.id),
-        author=Profile.from_user(
-            User.from_orm(author),
-            following=await profile_service.is_following(db, username=author.username, current_user=current_user),
-        ),
-    )
+    if favorited is not None:
+        await cache.invalidate_article(author=author.username, tag_list=article.tag_list)
+    (enriched,) = await enrich_articles(db, rows=[(article, author)], current_user=current_user)
+    return enriched
 
 
 async def unfavorite_article(db: DbSession, *, slug: str, current_user: AuthUser) -> Article | None:
-    if (article := await RealWorldArticle.by_slug(db, slug)) is None:
+    if (article := await RequestLoaders.of(db).articles_by_slug.load(slug)) is None:
         return None
 
-    author = await RealWorldUser.by_id(db, article.user_id)
+    author = await RequestLoaders.of(db).users_by_id.load(article.user_id)
     if author is None:
         return None
 
-    await db.execute(
+    unfavorited = await db.scalar(
         delete(ArticleFavorite)
         .where(ArticleFavorite.article_id == article.id)
         .where(ArticleFavorite.user_id == current_user.user_id)
+        .returning(ArticleFavorite.article_id)
     )
+    if unfavorited is not None:
+        await _add_to_favorites_count(db, article_id=article.id, delta=-1)
+
     await db.commit()
-    return Article(
-        **article.dict(),
-        favorited=False,
-        favorites_count=await get_article_favorites_count(db, article_id=article.id),
-        author=Profile.from_user(
-            User.from_orm(author),
-            following=await profile_service.is_following(db, username=author.username, current_user=current_user),
-        ),
-    )
+    if unfavorited is not None:
+        await cache.invalidate_article(author=author.username, tag_list=article.tag_list)
+    (enriched,) = await enrich_articles(db, rows=[(article, author)], current_user=current_user)
+    return enriched
 
 
 async def get_tags(db: DbSession) -> list[str]:
-    unnested = func.unnest(RealWorldArticle.tag_list)
-    tags = await db.scalars(select(unnested).distinct().order_by(unnested))
+    # Most used tags first
+    tags = await db.scalars(
+        select(Tag.name).where(Tag.articles_count > 0).order_by(Tag.articles_count.desc(), Tag.name)
+    )
+    return list(tags.all())
 
-    if tags is None:
-        return []
 
-    return list(tags.all())
+async def repair_articles_count(db: DbSession) -> int:
+    # Also creates the counter row, for databases created without the migrations
+    actual_count = select(func.count()).select_from(RealWorldArticle).scalar_subquery()
+    upsert = psql_insert(ArticlesCount).values(id=1, count=actual_count)
+    result = await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[ArticlesCount.id],
+            set_={"count": upsert.excluded.count},
+            where=ArticlesCount.count != upsert.excluded.count,
+        )
+    )
+    await db.commit()
+    return rowcount(result)
+
+
+async def repair_tag_counts(db: DbSession) -> int:
+    actual_count = select(func.count()).select_from(ArticleTag).where(ArticleTag.tag_name == Tag.name).scalar_subquery()
+    result = await db.execute(
+        update(Tag)
+        .where(Tag.articles_count != actual_count)
+        .values(articles_count=actual_count)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return rowcount(result)
+
+
+# Rows fetched from the server-side cursor at a time, and written out together
+EXPORT_BATCH_SIZE = 1_000
+
+
+async def export_articles(db: DbSession, *, updated_since: datetime | None = None) -> AsyncIterator[bytes]:
+    # NDJSON, read through a server-side cursor a batch at a time so that memory doesn't grow with the table. The
+    # rows come from the database, so the models are built without validating them again. Ordered by changed_at, so
+    # that the last line tells where the next incremental export starts, favorites count changes included.
+    query = (
+        select(
+            RealWorldArticle.slug,
+            RealWorldArticle.title,
+            RealWorldArticle.description,
+            RealWorldArticle.body,
+            RealWorldArticle.tag_list,
+            RealWorldArticle.created_at,
+            RealWorldArticle.updated_at,
+            RealWorldArticle.changed_at,
+            RealWorldArticle.favorites_count,
+            RealWorldUser.username,
+            RealWorldUser.bio,
+            RealWorldUser.image,
+        )
+        .join(RealWorldUser, RealWorldUser.id == RealWorldArticle.user_id)
+        .order_by(RealWorldArticle.changed_at, RealWorldArticle.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if updated_since is not None:
+        query = query.where(RealWorldArticle.changed_at >= updated_since)
+
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        yield b"".join(
+            render_json(
+                ExportedArticle.construct(
+                    slug=row.slug,
+                    title=row.title,
+                    description=row.description,
+                    body=row.body,
+                    tag_list=row.tag_list,
+                    created_at=row.created_at,
+                    updated_at=row.updated_at,
+                    changed_at=row.changed_at,
+                    favorites_count=row.favorites_count,
+                    author=ExportedAuthor.construct(username=row.username, bio=row.bio, image=row.image),
+                )
+            )
+            + b"\n"
+            for row in rows
+        )
+
+
+async def export_comments(db: DbSession, *, updated_since: datetime | None = None) -> AsyncIterator[bytes]:
+    query = (
+        select(
+            ArticleComment.id,
+            RealWorldArticle.slug,
+            ArticleComment.body,
+            ArticleComment.created_at,
+            ArticleComment.updated_at,
+            RealWorldUser.username,
+            RealWorldUser.bio,
+            RealWorldUser.image,
+        )
+        .join(RealWorldArticle, RealWorldArticle.id == ArticleComment.article_id)
+        .join(RealWorldUser, RealWorldUser.id == ArticleComment.user_id)
+        .order_by(ArticleComment.updated_at, ArticleComment.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if updated_since is not None:
+        query = query.where(ArticleComment.updated_at >= updated_since)
+
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        yield b"".join(
+            render_json(
+                ExportedComment.construct(
+                    id=row.id,
+                    article_slug=row.slug,
+                    body=row.body,
+                    created_at=row.created_at,
+                    updated_at=row.updated_at,
+                    author=ExportedAuthor.construct(username=row.username, bio=row.bio, image=row.image),
+                )
+            )
+            + b"\n"
+            for row in rows
+        )
@@ -0,0 +1,256 @@
+# Loads exported data straight into the tables with binary COPY, for migrating from another platform or filling a perf
+# environment. Going through the service functions costs an INSERT, a commit and a bcrypt hash per row, which takes
+# hours for millions of rows.
+#
+# A directory holds one file per table, named after it: user, follow, article, article_favorite and article_comment,
+# each either .ndjson (one JSON object per line) or .csv (with a header row). Fields are named after the columns.
+# Passwords must already be hashed with bcrypt. Ids that aren't UUIDs, like the integer keys of another database, are
+# mapped to UUIDs derived from them, so that files loaded separately still reference the same rows.
+import csv
+import json
+import uuid
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from slugify import slugify
+from sqlalchemy import Index, Table, func, select
+from sqlalchemy.dialects.postgresql import insert as psql_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from realworld.articles.model import ArticleComment, ArticleFavorite, ArticleTag, RealWorldArticle, Tag
+from realworld.database.core import Base
+from realworld.profiles.model import Follow
+from realworld.users.model import RealWorldUser
+
+_ID_NAMESPACE = uuid.UUID("5b0c3b5e-61a4-4c40-9d1e-4a52d52f4d1c")
+
+Record = dict[str, Any]
+
+
+class InvalidRecordError(Exception):
+    pass
+
+
+@dataclass
+class _Target:
+    table: Table
+    columns: list[str]
+    convert: Callable[[Record], tuple[Any, ...]]
+
+
+def _table(model: type[Base]) -> Table:
+    return Base.metadata.tables[model.__tablename__]
+
+
+def _id(kind: str, value: Any) -> uuid.UUID:  # noqa: ANN401
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return uuid.uuid5(_ID_NAMESPACE, f"{kind}:{value}")
+
+
+def _required(record: Record, field: str) -> Any:  # noqa: ANN401
+    if record.get(field) in (None, ""):
+        raise InvalidRecordError(f"missing {field}")
+    return record[field]
+
+
+def _optional(record: Record, field: str, default: Any = None) -> Any:  # noqa: ANN401
+    value = record.get(field)
+    return default if value in (None, "") else value
+
+
+def _timestamp(record: Record, field: str, default: datetime) -> datetime:
+    if (value := _optional(record, field)) is None:
+        return default
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+def _tag_list(record: Record) -> list[str]:
+    # A JSON array in .ndjson files, comma separated in .csv files
+    value = _optional(record, "tag_list", [])
+    tags = value.split(",") if isinstance(value, str) else value
+    return [tag.strip() for tag in tags if tag.strip()]
+
+
+class _Slugs:
+    # Slugs are derived from titles like create_article does, with a suffix when a title was already taken
+    def __init__(self, taken: set[str]) -> None:
+        self.taken = taken
+
+    def claim(self, record: Record) -> str:
+        base = _optional(record, "slug") or slugify(_required(record, "title"))
+        slug, suffix = base, 1
+        while slug in self.taken:
+            suffix += 1
+            slug = f"{base}-{suffix}"
+        self.taken.add(slug)
+        return slug
+
+
+def _targets(slugs: _Slugs, now: datetime) -> list[_Target]:
+    # In the order they must be loaded in, for foreign keys. Denormalized counters start at zero and are repaired after.
+    def user(record: Record) -> tuple[Any, ...]:
+        return (
+            _id("user", _required(record, "id")),
+            _required(record, "username"),
+            _required(record, "email"),
+            _optional(record, "bio", ""),
+            _optional(record, "image"),
+            _required(record, "password_hash"),
+            0,
+            _timestamp(record, "created_at", now),
+        )
+
+    def follow(record: Record) -> tuple[Any, ...]:
+        return (
+            _id("user", _required(record, "following_user_id")),
+            _id("user", _required(record, "followed_user_id")),
+            _timestamp(record, "created_at", now),
+        )
+
+    def article(record: Record) -> tuple[Any, ...]:
+        created_at = _timestamp(record, "created_at", now)
+        return (
+            _id("article", _required(record, "id")),
+            _id("user", _required(record, "user_id")),
+            slugs.claim(record),
+            _required(record, "title"),
+            _optional(record, "description", ""),
+            _optional(record, "body", ""),
+            _tag_list(record),
+            0,
+            created_at,
+            _timestamp(record, "updated_at", created_at),
+        )
+
+    def article_favorite(record: Record) -> tuple[Any, ...]:
+        return (
+            _id("article", _required(record, "article_id")),
+            _id("user", _required(record, "user_id")),
+            _timestamp(record, "created_at", now),
+        )
+
+    def article_comment(record: Record) -> tuple[Any, ...]:
+        # Comment ids come from the sequence, nothing references them
+        created_at = _timestamp(record, "created_at", now)
+        return (
+            _id("article", _required(record, "article_id")),
+            _id("user", _required(record, "user_id")),
+            _required(record, "body"),
+            created_at,
+            _timestamp(record, "updated_at", created_at),
+        )
+
+    return [
+        _Target(
+            _table(RealWorldUser),
+            ["id", "username", "email", "bio", "image", "password_hash", "followers_count", "created_at"],
+            user,
+        ),
+        _Target(_table(Follow), ["following_user_id", "followed_user_id", "created_at"], follow),
+        _Target(
+            _table(RealWorldArticle),
+            [
+                "id",
+                "user_id",
+                "slug",
+                "title",
+                "description",
+                "body",
+                "tag_list",
+                "favorites_count",
+                "created_at",
+                "updated_at",
+            ],
+            article,
+        ),
+        _Target(_table(ArticleFavorite), ["article_id", "user_id", "created_at"], article_favorite),
+        _Target(
+            _table(ArticleComment),
+            ["article_id", "user_id", "body", "created_at", "updated_at"],
+            article_comment,
+        ),
+    ]
+
+
+def _find_file(directory: Path, table: Table) -> Path | None:
+    for suffix in (".ndjson", ".csv"):
+        if (path := directory / f"{table.name}{suffix}").exists():
+            return path
+    return None
+
+
+def _read(path: Path) -> Iterator[Record | str]:
+    # .ndjson lines are parsed by the caller, so that a malformed one is reported like any other invalid record
+    with path.open(newline="", encoding="utf-8") as file:
+        if path.suffix == ".csv":
+            yield from csv.DictReader(file)
+        else:
+            yield from (line for line in file if line.strip())
+
+
+def _rows(path: Path, target: _Target, counter: list[int]) -> Iterator[tuple[Any, ...]]:
+    # Read lazily, COPY streams the rows to the server as they're converted
+    for line_number, line in enumerate(_read(path), start=1):
+        try:
+            record = json.loads(line) if isinstance(line, str) else line
+            if not isinstance(record, dict):
+                raise InvalidRecordError("not a JSON object")
+            row = target.convert(record)
+        except (InvalidRecordError, ValueError, TypeError, AttributeError) as e:
+            raise InvalidRecordError(f"{path}, record {line_number}: {e}") from e
+        counter[0] += 1
+        yield row
+
+
+async def load(
+    conn: AsyncConnection, *, directory: Path, defer_indexes: bool = False, maintenance_work_mem: str | None = None
+) -> dict[str, int]:
+    # Runs in the transaction of conn, nothing is visible until it's committed. Returns the rows copied per table.
+    # The driver only opens the transaction on the first statement, COPY must come after one to be part of it.
+    if maintenance_work_mem is not None:
+        await conn.execute(select(func.set_config("maintenance_work_mem", maintenance_work_mem, True)))
+    slugs = _Slugs(set(await conn.scalars(select(RealWorldArticle.slug))))
+    files = [
+        (target, path)
+        for target in _targets(slugs, datetime.now(tz=UTC))
+        if (path := _find_file(directory, target.table)) is not None
+    ]
+    if not files:
+        raise InvalidRecordError(f"no .ndjson or .csv file named after a table in {directory}")
+
+    # Building an index once at the end is much faster than updating it for every row. The unique ones are rebuilt
+    # in the same transaction, so duplicates still fail the load. Primary keys and unique constraints are kept.
+    deferred: list[Index] = []
+    if defer_indexes:
+        deferred = [index for target, _ in files for index in sorted(target.table.indexes, key=lambda i: str(i.name))]
+        for index in deferred:
+            await conn.execute(DropIndex(index))
+
+    driver_connection = (await conn.get_raw_connection()).driver_connection
+    assert driver_connection is not None
+    copied: dict[str, int] = {}
+    for target, path in files:
+        counter = [0]
+        await driver_connection.copy_records_to_table(
+            target.table.name, records=_rows(path, target, counter), columns=target.columns
+        )
+        copied[target.table.name] = counter[0]
+
+    if RealWorldArticle.__tablename__ in copied:
+        tag_names = select(func.unnest(RealWorldArticle.tag_list)).distinct()
+        await conn.execute(psql_insert(Tag).from_select(["name"], tag_names).on_conflict_do_nothing())
+        article_tags = select(RealWorldArticle.id, func.unnest(RealWorldArticle.tag_list)).distinct()
+        await conn.execute(
+            psql_insert(ArticleTag).from_select(["article_id", "tag_name"], article_tags).on_conflict_do_nothing()
+        )
+
+    for index in deferred:
+        await conn.execute(CreateIndex(index))
+    return copied
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from realworld import bulk_load
+from realworld.articles import cache as article_cache
+from realworld.articles import service as article_service
+from realworld.database.core import async_engine, export_sessionmaker, sessionmaker
+from realworld.feed import service as feed_service
+from realworld.profiles import service as profile_service
+from realworld.response_cache import response_cache
+
+
+async def repair_counters(_: argparse.Namespace) -> None:
+    async with sessionmaker() as db:
+        repaired_articles = await article_service.repair_favorites_counts(db)
+        repaired_total = await article_service.repair_articles_count(db)
+        repaired_tags = await article_service.repair_tag_counts(db)
+        repaired_users = await profile_service.repair_followers_counts(db)
+
+    print(f"Repaired favorites_count of {repaired_articles} article(s)")
+    print(f"Repaired {repaired_total} articles_count row(s)")
+    print(f"Repaired articles_count of {repaired_tags} tag(s)")
+    print(f"Repaired followers_count of {repaired_users} user(s)")
+
+
+async def load(args: argparse.Namespace) -> None:
+    try:
+        async with async_engine.begin() as conn:
+            copied = await bulk_load.load(
+                conn,
+                directory=args.directory,
+                defer_indexes=args.defer_indexes,
+                maintenance_work_mem=args.maintenance_work_mem,
+            )
+    except bulk_load.InvalidRecordError as e:
+        sys.exit(f"Nothing was loaded: {e}")
+
+    for table, rows in copied.items():
+        print(f"Copied {rows} row(s) into {table}")
+
+    # Counters and feeds are derived from the rows, the same way as after any other bulk change
+    await repair_counters(args)
+    async with sessionmaker() as db:
+        feed_entries = await feed_service.rebuild_feeds(db)
+    print(f"Added {feed_entries} feed entries")
+    # The servers' in-memory caches can't be reached from here, their entries expire on their own shortly after
+    if response_cache.backend.shared:
+        await article_cache.invalidate_all()
+
+
+async def export(args: argparse.Namespace) -> None:
+    exports = {"articles": article_service.export_articles, "comments": article_service.export_comments}
+    output = args.output.open("wb") if args.output is not None else sys.stdout.buffer
+    try:
+        async with export_sessionmaker() as db:
+            async for chunk in exports[args.what](db, updated_since=args.updated_since):
+                output.write(chunk)
+    finally:
+        if args.output is not None:
+            output.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="realworld")
+    commands = parser.add_subparsers(required=True)
+
+    repair_counters_parser = commands.add_parser(
+        "repair-counters",
+        help="reconcile denormalized counters with the rows they count",
+    )
+    repair_counters_parser.set_defaults(handler=repair_counters)
+
+    load_parser = commands.add_parser(
+        "load",
+        help="bulk load users, follows, articles, favorites and comments exported as .ndjson or .csv files",
+    )
+    load_parser.add_argument("directory", type=Path, help="directory with a file named after each table to load")
+    load_parser.add_argument(
+        "--defer-indexes",
+        action="store_true",
+        help="drop the indexes of the loaded tables and build them after copying, faster when loading a lot of rows",
+    )
+    load_parser.add_argument(
+        "--maintenance-work-mem",
+        help="memory for building the indexes, like 1GB, instead of the server's maintenance_work_mem",
+    )
+    load_parser.set_defaults(handler=load)
+
+    export_parser = commands.add_parser("export", help="write all articles or comments as NDJSON, one per line")
+    export_parser.add_argument("what", choices=["articles", "comments"])
+    export_parser.add_argument(
+        "--updated-since",
+        type=datetime.fromisoformat,
+        help="only export what was created or changed at or after this ISO 8601 time",
+    )
+    export_parser.add_argument("--output", type=Path, help="file to write to instead of the standard output")
+    export_parser.set_defaults(handler=export)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,13 +13,86 @@ DATABASE_CREDENTIALS = config("DATABASE_CREDENTIALS", cast=SecretStr)
     _DATABASE_CREDENTIAL_USER,
     _DATABASE_CREDENTIAL_PASSWORD,
 ) = DATABASE_CREDENTIALS.get_secret_value().split(":")
+# Per engine, so per worker process and separately for the replica
 DATABASE_ENGINE_POOL_SIZE = config("DATABASE_ENGINE_POOL_SIZE", cast=int, default=10)
+# Connections opened on top of the pool size under load, closed again when they're returned
+DATABASE_ENGINE_MAX_OVERFLOW = config("DATABASE_ENGINE_MAX_OVERFLOW", cast=int, default=10)
+# Seconds a request waits for a connection before failing
+DATABASE_ENGINE_POOL_TIMEOUT = config("DATABASE_ENGINE_POOL_TIMEOUT", cast=float, default=30)
+# Seconds after which connections are replaced, -1 to keep them
+DATABASE_ENGINE_POOL_RECYCLE = config("DATABASE_ENGINE_POOL_RECYCLE", cast=int, default=-1)
+# Tests connections when they're checked out, at the cost of a round trip
+DATABASE_ENGINE_POOL_PRE_PING = config("DATABASE_ENGINE_POOL_PRE_PING", cast=bool, default=False)
+# Prepared statements cached per connection, 0 behind a pgbouncer in transaction mode
+DATABASE_PREPARED_STATEMENT_CACHE_SIZE = config("DATABASE_PREPARED_STATEMENT_CACHE_SIZE", cast=int, default=100)
 SQLALCHEMY_DATABASE_URI = f"postgresql+asyncpg://{_DATABASE_CREDENTIAL_USER}:{_DATABASE_CREDENTIAL_PASSWORD}@{DATABASE_HOSTNAME}:{DATABASE_PORT}/{DATABASE_NAME}"
 
+# Optional streaming replica, with the same database name and credentials, for the read-only routes. Left empty,
+# everything is read from the primary. Reads fall back to the primary while the replica is unreachable or more than
+# DATABASE_REPLICA_MAX_LAG_SECONDS behind, and for DATABASE_REPLICA_STICKY_SECONDS after a user's own writes.
+DATABASE_REPLICA_HOSTNAME = config("DATABASE_REPLICA_HOSTNAME", cast=str, default="")
+DATABASE_REPLICA_PORT = config("DATABASE_REPLICA_PORT", cast=str, default=DATABASE_PORT)
+SQLALCHEMY_REPLICA_DATABASE_URI = (
+    f"postgresql+asyncpg://{_DATABASE_CREDENTIAL_USER}:{_DATABASE_CREDENTIAL_PASSWORD}@{DATABASE_REPLICA_HOSTNAME}:{DATABASE_REPLICA_PORT}/{DATABASE_NAME}"
+    if DATABASE_REPLICA_HOSTNAME
+    else None
+)
+DATABASE_REPLICA_MAX_LAG_SECONDS = config("DATABASE_REPLICA_MAX_LAG_SECONDS", cast=float, default=5)
+DATABASE_REPLICA_CHECK_INTERVAL_SECONDS = config("DATABASE_REPLICA_CHECK_INTERVAL_SECONDS", cast=float, default=2)
+DATABASE_REPLICA_STICKY_SECONDS = config("DATABASE_REPLICA_STICKY_SECONDS", cast=float, default=10)
+
+# Articles of authors with more followers than this aren't copied into their followers' feeds but merged in on read
+FEED_FANOUT_MAX_FOLLOWERS = config("FEED_FANOUT_MAX_FOLLOWERS", cast=int, default=10_000)
+# How many of an author's latest articles are copied into a new follower's feed
+FEED_BACKFILL_LIMIT = config("FEED_BACKFILL_LIMIT", cast=int, default=500)
+# Per-user feed sizes are cached in each worker for this long, instead of counting the whole feed on every page
+FEED_COUNT_CACHE_MAX_SIZE = config("FEED_COUNT_CACHE_MAX_SIZE", cast=int, default=10_000)
+FEED_COUNT_CACHE_TTL_SECONDS = config("FEED_COUNT_CACHE_TTL_SECONDS", cast=float, default=30)
+
+# Whether article lists include each article's body when no fields= are requested. Newer versions of the RealWorld
+# spec leave it out of lists, which also spares reading large bodies.
+ARTICLES_LIST_INCLUDE_BODY = config("ARTICLES_LIST_INCLUDE_BODY", cast=bool, default=True)
+
+# Shared cache of anonymous list responses. "memory://" keeps it per process, a redis:// URL shares it between
+# processes. Entries are served fresh for RESPONSE_CACHE_FRESH_SECONDS, then stale while they're refreshed for
+# RESPONSE_CACHE_STALE_SECONDS more. Writes invalidate the entries they affect right away, but only in the worker that
+# handled them with "memory://", so with several workers use redis:// or the others serve out of date lists for up
+# to RESPONSE_CACHE_MEMORY_TTL_SECONDS, which caps how long "memory://" entries live.
+RESPONSE_CACHE_URL = config("RESPONSE_CACHE_URL", cast=str, default="memory://")
+RESPONSE_CACHE_MAX_ENTRIES = config("RESPONSE_CACHE_MAX_ENTRIES", cast=int, default=10_000)
+RESPONSE_CACHE_FRESH_SECONDS = config("RESPONSE_CACHE_FRESH_SECONDS", cast=float, default=30)
+RESPONSE_CACHE_STALE_SECONDS = config("RESPONSE_CACHE_STALE_SECONDS", cast=float, default=300)
+RESPONSE_CACHE_MEMORY_TTL_SECONDS = config("RESPONSE_CACHE_MEMORY_TTL_SECONDS", cast=float, default=5)
+
+# Serializes list responses with orjson and without validating them again against their response_model.
+# Requires the orjson extra.
+FAST_JSON_RESPONSES = config("FAST_JSON_RESPONSES", cast=bool, default=False)
+
+# Statements taking at least this many seconds are logged with the types of their parameters, 0 to disable
+SLOW_QUERY_SECONDS = config("SLOW_QUERY_SECONDS", cast=float, default=0.2)
+# Logs requests running the same statement more than this many times, usually a query in a loop. 0 to disable.
+N_PLUS_ONE_THRESHOLD = config("N_PLUS_ONE_THRESHOLD", cast=int, default=10)
+
+# Request, latency and database metrics in the Prometheus text format, per worker process
+METRICS_ENABLED = config("METRICS_ENABLED", cast=bool, default=True)
+METRICS_PATH = config("METRICS_PATH", cast=str, default="/metrics")
+
+# Mounts /api/internal/* (pool statistics, ...), which must not be reachable from outside
+INTERNAL_ENDPOINTS_ENABLED = config("INTERNAL_ENDPOINTS_ENABLED", cast=bool, default=False)
+
 JWT_EXP_MINUTES = config("JWT_EXP_MINUTES", cast=int, default=60 * 24)
 JWT_SECRET = config("JWT_SECRET", cast=SecretStr)
 JWT_ALG = "HS256"
 
+# bcrypt cost factor, hashes with a different cost are transparently rehashed on login
+PASSWORD_HASH_ROUNDS = config("PASSWORD_HASH_ROUNDS", cast=int, default=12)
+# How many passwords may be hashed or verified at the same time, per process
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", cast=int, default=4)
+
+# Verified tokens are cached per process for at most this long, a max size of 0 disables the cache
+AUTH_CACHE_MAX_SIZE = config("AUTH_CACHE_MAX_SIZE", cast=int, default=10_000)
+AUTH_CACHE_TTL_SECONDS = config("AUTH_CACHE_TTL_SECONDS", cast=float, default=60)
+
 CORS_ORIGIN_ALLOW_ALL = config("CORS_ORIGIN_ALLOW_ALL", cast=bool, default=True)
 CORS_ALLOWED_ORIGINS = config("CORS_ALLOWED_ORIGINS", cast=CommaSeparatedStrings, default=CommaSeparatedStrings(["*"]))
 CORS_ALLOWED_HEADERS = config("CORS_ALLOWED_HEADERS", cast=CommaSeparatedStrings, default=CommaSeparatedStrings(["*"]))
@@ -1,38 +1,153 @@
 from collections.abc import AsyncGenerator
-from typing import Annotated, Any
+from typing import Annotated, Any, cast
 
 from fastapi import Depends
+from sqlalchemy import CursorResult, Engine, Result, event, inspect
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
+from sqlalchemy.sql.dml import UpdateBase
 
 from realworld import config
+from realworld.database.pool import InstrumentedQueuePool
+from realworld.database.routing import ReplicaRouter, current_user_id
+from realworld.database.scoping import register_request_session
 
-async_engine = create_async_engine(
-    config.SQLALCHEMY_DATABASE_URI,
-    pool_size=config.DATABASE_ENGINE_POOL_SIZE,
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.DATABASE_ENGINE_POOL_SIZE,
+        max_overflow=config.DATABASE_ENGINE_MAX_OVERFLOW,
+        pool_timeout=config.DATABASE_ENGINE_POOL_TIMEOUT,
+        pool_recycle=config.DATABASE_ENGINE_POOL_RECYCLE,
+        pool_pre_ping=config.DATABASE_ENGINE_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": config.DATABASE_PREPARED_STATEMENT_CACHE_SIZE},
+    )
+
+
+async_engine = _create_engine(config.SQLALCHEMY_DATABASE_URI)
+
+replica_engine = (
+    _create_engine(config.SQLALCHEMY_REPLICA_DATABASE_URI)
+    if config.SQLALCHEMY_REPLICA_DATABASE_URI is not None
+    else None
 )
 
+# Read-only sessions run each statement in its own transaction instead of keeping one open until they're closed
+_autocommit_engine = async_engine.sync_engine.execution_options(isolation_level="AUTOCOMMIT")
+_autocommit_replica_engine = (
+    replica_engine.sync_engine.execution_options(isolation_level="AUTOCOMMIT") if replica_engine is not None else None
+)
+
+replica_router = ReplicaRouter(
+    replica_engine,
+    max_lag_seconds=config.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=config.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS,
+    sticky_seconds=config.DATABASE_REPLICA_STICKY_SECONDS,
+)
+
+
+class PrimarySession(Session):
+    pass
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _record_write(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _record_flush(session: Session, _: Any) -> None:  # noqa: ANN401
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _stick_to_primary(session: Session) -> None:
+    # The user who just wrote reads from the primary for a while, the replica may not have their write yet
+    if session.info.pop("wrote", False):
+        replica_router.mark_write(current_user_id.get())
+
+
+class ReadSession(Session):
+    # The engine is picked for each statement rather than for the session, since the current user is only known once
+    # the request's dependencies have run. Anything that writes goes to the primary, in a transaction.
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:  # noqa: ANN401
+        if self._flushing or isinstance(clause, UpdateBase):
+            return async_engine.sync_engine
+        if _autocommit_replica_engine is None or not replica_router.use_replica(current_user_id.get()):
+            return _autocommit_engine
+        return _autocommit_replica_engine
+
+
 sessionmaker = async_sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
-    autoflush=True,
+    sync_session_class=PrimarySession,
+    # Services flush explicitly where they need to, instead of before every query
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+read_sessionmaker = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=ReadSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# For single lookups made outside of the request's sessions, like authenticating the current user. They read from the
+# primary, which always has the latest writes, and each statement commits on its own.
+lookup_sessionmaker = async_sessionmaker(
+    bind=async_engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# For long reads streamed through a server-side cursor, which needs a transaction so can't use the autocommit engines.
+# They don't need to be up to date to the second, so they're sent to the replica when there is one.
+export_sessionmaker = async_sessionmaker(
+    bind=replica_engine or async_engine,
+    class_=AsyncSession,
+    autoflush=False,
     expire_on_commit=False,
 )
 
 
 class Base(AsyncAttrs, DeclarativeBase):
     def dict(self) -> dict[Any, Any]:
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        # Deferred columns that haven't been loaded are left out instead of being lazy loaded
+        unloaded = inspect(self).unloaded
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns if c.name not in unloaded}
 
 
+# Sessions only check out a connection when they first run a statement, and give it back when their transaction
+# ends. Whatever they still hold is released once the response starts, see RequestSessionsMiddleware.
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with sessionmaker() as session:
+        register_request_session(session)
         yield session
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with read_sessionmaker() as session:
+        register_request_session(session)
+        yield session
+
+
+def rowcount(result: Result[Any]) -> int:
+    # The rows matched by an UPDATE or DELETE, which AsyncSession.execute types as a plain Result
+    return cast(CursorResult[Any], result).rowcount
+
+
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+# For read-only routes, reads from the replica when there is a usable one
+ReadDbSession = Annotated[AsyncSession, Depends(get_read_db)]
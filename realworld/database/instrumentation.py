@@ -0,0 +1,154 @@
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from realworld import config
+
+logger = logging.getLogger(__name__)
+
+# Runs of bound parameters, e.g. the expanded list of an IN, which vary in length for the same statement. asyncpg
+# statements cast each parameter to its type, as in $3::UUID or $1::TIMESTAMP WITH TIME ZONE.
+_PARAMETER = r"\$\d+(?:::\w+(?:\(\d+(?:,\s*\d+)?\))?(?: WITH(?:OUT)? TIME ZONE)?(?:\[\])*)?"
+_PARAMETER_LIST = re.compile(rf"{_PARAMETER}(?:\s*,\s*{_PARAMETER})*")
+
+
+def statement_shape(statement: str) -> str:
+    return _PARAMETER_LIST.sub("$?", " ".join(statement.split()))
+
+
+def parameters_shape(parameters: Any) -> str:  # noqa: ANN401
+    # The types of the bound parameters without their values, which may be personal data
+    if isinstance(parameters, list):
+        return f"{len(parameters)} x {parameters_shape(parameters[0])}" if parameters else "[]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, tuple):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+@dataclass
+class QueryLog:
+    route: str
+    count: int = 0
+    seconds: float = 0.0
+    # How many times each statement shape ran
+    shapes: Counter[str] = field(default_factory=Counter)
+    # Every statement that ran, only kept when capturing
+    statements: list[str] | None = None
+
+
+# The queries of the current request, or of the current capture_queries() block
+query_log: ContextVar[QueryLog | None] = ContextVar("query_log", default=None)
+
+
+def _record(statement: str, parameters: Any, seconds: float) -> None:  # noqa: ANN401
+    log = query_log.get()
+    route = log.route if log is not None else "-"
+
+    if config.SLOW_QUERY_SECONDS > 0 and seconds >= config.SLOW_QUERY_SECONDS:
+        logger.warning(
+            "Slow query (%.3fs) in %s: %s parameters=%s", seconds, route, statement, parameters_shape(parameters)
+        )
+
+    if log is None:
+        return
+
+    log.count += 1
+    log.seconds += seconds
+    if log.statements is not None:
+        log.statements.append(statement)
+
+    shape = statement_shape(statement)
+    log.shapes[shape] += 1
+    # Logged once per request, when the statement runs one time too many
+    if config.N_PLUS_ONE_THRESHOLD > 0 and log.shapes[shape] == config.N_PLUS_ONE_THRESHOLD + 1:
+        logger.warning("Same statement ran more than %d times in %s: %s", config.N_PLUS_ONE_THRESHOLD, route, shape)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_query(*args: Any) -> None:  # noqa: ANN401
+        context: ExecutionContext = args[4]
+        context._query_started_at = time.perf_counter()  # type: ignore[attr-defined]
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _end_query(*args: Any) -> None:  # noqa: ANN401
+        statement: str = args[2]
+        context: ExecutionContext = args[4]
+        _record(statement, args[3], time.perf_counter() - context._query_started_at)  # type: ignore[attr-defined]
+
+
+def route_template(routes: Sequence[BaseRoute], scope: Scope) -> str:
+    # The path the route was declared with, e.g. /api/articles/{slug}, so that requests for different articles are
+    # grouped together. Kept in the scope for the other middlewares.
+    if "realworld.route" in scope:
+        return str(scope["realworld.route"])
+
+    template = "unmatched"
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            template = str(getattr(route, "path", template))
+            break
+        if match == Match.PARTIAL and template == "unmatched":
+            template = str(getattr(route, "path", template))
+
+    scope["realworld.route"] = template
+    return template
+
+
+# Attributes the statements run while handling a request to its route. The log is left in the scope for the
+# middlewares wrapping this one.
+class QueryLogMiddleware:
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]) -> None:
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog(route=f"{scope['method']} {route_template(self.routes, scope)}")
+        scope["realworld.query_log"] = log
+        token = query_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            query_log.reset(token)
+
+
+@contextmanager
+def capture_queries(label: str = "capture") -> Iterator[QueryLog]:
+    log = QueryLog(route=label, statements=[])
+    token = query_log.set(log)
+    try:
+        yield log
+    finally:
+        query_log.reset(token)
+
+
+@contextmanager
+def assert_max_queries(expected: int, label: str = "capture") -> Iterator[QueryLog]:
+    # Pins how many queries a block runs, listing them when it runs more
+    with capture_queries(label) as log:
+        yield log
+
+    if log.count > expected:
+        statements = "\n".join(f"  {statement_shape(statement)}" for statement in log.statements or [])
+        raise AssertionError(f"{label} ran {log.count} queries, expected at most {expected}:\n{statements}")
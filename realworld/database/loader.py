@@ -0,0 +1,58 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Mapping
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+# An identity map for lookups by key: the first load of a key calls batch_load, later loads of it get the memoized
+# result, misses included, for the lifetime of the loader. Loads are awaited one at a time, so a call usually resolves
+# a single key; keys requested concurrently in the same tick of the event loop share one call.
+# The batch runs in the task of the first load of the tick, so it's cancelled along with the request whose session it
+# uses. Callers must not use the same session concurrently with a pending load.
+class Loader(Generic[K, V]):
+    def __init__(self, batch_load: Callable[[list[K]], Awaitable[Mapping[K, V]]]) -> None:
+        self._batch_load = batch_load
+        self._results: dict[K, asyncio.Future[V | None]] = {}
+        self._pending: list[K] = []
+
+    async def load(self, key: K) -> V | None:
+        if (result := self._results.get(key)) is None:
+            result = asyncio.get_running_loop().create_future()
+            self._results[key] = result
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                await self._dispatch()
+
+        return await result
+
+    def prime(self, key: K, value: V) -> None:
+        if key not in self._results:
+            result = asyncio.get_running_loop().create_future()
+            result.set_result(value)
+            self._results[key] = result
+
+    async def _dispatch(self) -> None:
+        # Lets the other loads of this tick join the batch before it's sent
+        keys = self._pending
+        try:
+            await asyncio.sleep(0)
+            self._pending = []
+            values = await self._batch_load(keys)
+        except BaseException as exc:
+            if self._pending is keys:
+                self._pending = []
+            for key in keys:
+                # Failures aren't memoized so that a later load can retry. A cancelled batch cancels its loads.
+                result = self._results.pop(key)
+                if isinstance(exc, Exception):
+                    result.set_exception(exc)
+                else:
+                    result.cancel()
+            if not isinstance(exc, Exception):
+                raise
+            return
+
+        for key in keys:
+            self._results[key].set_result(values.get(key))
@@ -0,0 +1,46 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool
+
+
+# Records how long checkouts wait for a connection, including opening new ones, which is where an undersized pool
+# shows up in request latency
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    checkouts = 0
+    checkout_timeouts = 0
+    checkout_wait_seconds = 0.0
+    max_checkout_wait_seconds = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.checkout_wait_seconds += waited
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, waited)
+
+
+def pool_stats(pool: Pool) -> dict[str, int | float]:
+    stats: dict[str, int | float] = {}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # Negative while the pool hasn't opened pool_size connections yet
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            checkout_timeouts=pool.checkout_timeouts,
+            checkout_wait_seconds=pool.checkout_wait_seconds,
+            max_checkout_wait_seconds=pool.max_checkout_wait_seconds,
+        )
+    return stats
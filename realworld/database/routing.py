@@ -0,0 +1,110 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from realworld.logger import logger
+
+# The authenticated user of the current request, set by the users dependencies
+current_user_id: ContextVar[uuid.UUID | None] = ContextVar("current_user_id", default=None)
+
+# How far the replica is behind the primary. A replica that has replayed everything it received isn't lagging, however
+# old its last replayed transaction is. A server that isn't in recovery never lags.
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+# Decides whether reads go to the replica. They don't when there is no replica, when it's unreachable or lagging,
+# or for a user who wrote something in the last sticky_seconds, so that they see their own writes.
+# Recent writers are tracked per process.
+class ReplicaRouter:
+    def __init__(
+        self,
+        engine: AsyncEngine | None,
+        *,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+        sticky_seconds: float,
+    ) -> None:
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.sticky_seconds = sticky_seconds
+        self.healthy = False
+        self.lag_seconds: float | None = None
+        # Ordered by when each user's window ends, since all windows have the same length
+        self._recent_writers: OrderedDict[uuid.UUID, float] = OrderedDict()
+        self._monitor: asyncio.Task[None] | None = None
+
+        if engine is not None:
+            event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def use_replica(self, user_id: uuid.UUID | None) -> bool:
+        if self.engine is None or not self.healthy:
+            return False
+
+        if user_id is None:
+            return True
+
+        sticky_until = self._recent_writers.get(user_id)
+        return sticky_until is None or sticky_until <= time.monotonic()
+
+    def mark_write(self, user_id: uuid.UUID | None) -> None:
+        if self.engine is None or user_id is None:
+            return
+
+        now = time.monotonic()
+        self._recent_writers[user_id] = now + self.sticky_seconds
+        self._recent_writers.move_to_end(user_id)
+        while self._recent_writers and next(iter(self._recent_writers.values())) <= now:
+            self._recent_writers.popitem(last=False)
+
+    async def check(self) -> None:
+        if self.engine is None:
+            return
+
+        try:
+            # A replica that takes longer than a check interval to answer isn't usable either
+            async with asyncio.timeout(self.check_interval_seconds), self.engine.connect() as connection:
+                lag = await connection.scalar(REPLICA_LAG_QUERY)
+        except Exception:
+            if self.healthy:
+                logger.warning("Read replica is unavailable, reading from the primary", exc_info=True)
+            self.healthy = False
+            return
+
+        self.lag_seconds = float(lag or 0)
+        healthy = self.lag_seconds <= self.max_lag_seconds
+        if self.healthy and not healthy:
+            logger.warning("Read replica is %.1fs behind, reading from the primary", self.lag_seconds)
+        self.healthy = healthy
+
+    def start(self) -> None:
+        if self.engine is not None and self._monitor is None:
+            self._monitor = asyncio.create_task(self._run_checks())
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+    async def _run_checks(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval_seconds)
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        # Stop reading from the replica as soon as a connection to it fails, instead of at the next check
+        if context.is_disconnect or context.connection is None:
+            self.healthy = False
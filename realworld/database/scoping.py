@@ -0,0 +1,43 @@
+from contextvars import ContextVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_request_sessions: ContextVar[list[AsyncSession] | None] = ContextVar("request_sessions", default=None)
+
+
+def register_request_session(session: AsyncSession) -> None:
+    if (sessions := _request_sessions.get()) is not None:
+        sessions.append(session)
+
+
+async def _close_sessions(sessions: list[AsyncSession]) -> None:
+    while sessions:
+        await sessions.pop().close()
+
+
+# Closes the request's sessions, returning their connections to the pool, as soon as the handler is done and the
+# response starts. Otherwise they'd only be closed once the whole response has been sent, holding a connection for
+# as long as the slowest client takes to read it. Responses streamed from the database need their own session.
+class RequestSessionsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sessions: list[AsyncSession] = []
+        token = _request_sessions.set(sessions)
+
+        async def send_after_closing_sessions(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await _close_sessions(sessions)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_after_closing_sessions)
+        finally:
+            _request_sessions.reset(token)
+            await _close_sessions(sessions)
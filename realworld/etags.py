@@ -0,0 +1,22 @@
+import hashlib
+
+from fastapi import Response
+
+
+def make_etag(*parts: object) -> str:
+    # Strong validator over everything that ends up in the representation, including the viewer-dependent bits
+    digest = hashlib.sha1(repr(parts).encode("utf-8"), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    if if_none_match is None:
+        return False
+
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
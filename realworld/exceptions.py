@@ -1,5 +1,15 @@
+from http import HTTPStatus
+
 from fastapi import HTTPException
 
 
 class ApiError(HTTPException):
     pass
+
+
+class InvalidCursorError(ApiError):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail={"cursor": ["is invalid"]},
+        )
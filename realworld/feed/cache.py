@@ -0,0 +1,45 @@
+import time
+import uuid
+from collections import OrderedDict
+
+from realworld import config
+
+
+# Bounded LRU cache of how many articles are in each user's feed. Counting a feed reads all of it, which polling the
+# first page would otherwise do every time on top of the page's own index range scan. A count may miss the articles
+# published since it was taken for up to the TTL. The cache is per process, follows drop the follower's count in the
+# process that handled them, and the TTL bounds how long other workers keep it.
+class FeedCountCache:
+    def __init__(self, *, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[uuid.UUID, tuple[int, float]] = OrderedDict()
+
+    def get(self, user_id: uuid.UUID) -> int | None:
+        if (entry := self._entries.get(user_id)) is None:
+            return None
+
+        count, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return count
+
+    def set(self, user_id: uuid.UUID, count: int) -> None:
+        if self.max_size <= 0:
+            return
+
+        self._entries[user_id] = (count, time.time() + self.ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+
+
+feed_count_cache = FeedCountCache(
+    max_size=config.FEED_COUNT_CACHE_MAX_SIZE, ttl_seconds=config.FEED_COUNT_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,19 @@
+from sqlalchemy import DateTime, ForeignKey, Index, Uuid
+from sqlalchemy.orm import mapped_column
+
+from realworld.database.core import Base
+
+
+class FeedEntry(Base):
+    # Materialized feed: one row per follower for every article of the authors they follow. Authors with a lot of
+    # followers are not fanned out, their articles are merged into the feed at read time instead.
+    __tablename__ = "feed_entry"
+    __table_args__ = (
+        Index("ix_feed_entry_user_id_created_at", "user_id", "created_at", "article_id"),
+        Index("ix_feed_entry_user_id_author_id", "user_id", "author_id"),
+    )
+    user_id = mapped_column(Uuid, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, primary_key=True)
+    article_id = mapped_column(Uuid, ForeignKey("article.id", ondelete="CASCADE"), nullable=False, primary_key=True)
+    author_id = mapped_column(Uuid, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    # Copied from the article so that the feed can be paginated without touching the article table
+    created_at = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import CompoundSelect, Select, Uuid, delete, literal, select, tuple_, union, update
+from sqlalchemy.dialects.postgresql import insert as psql_insert
+
+from realworld import config
+from realworld.articles.model import RealWorldArticle
+from realworld.database.core import DbSession, rowcount, sessionmaker
+from realworld.feed.model import FeedEntry
+from realworld.profiles.model import Follow
+from realworld.users.model import RealWorldUser
+
+_FEED_ENTRY_COLUMNS = ["user_id", "article_id", "author_id", "created_at"]
+
+
+def _fanned_out_entries() -> Select:
+    # A feed entry for every follower of the author of every article that was fanned out
+    return (
+        select(Follow.following_user_id, RealWorldArticle.id, RealWorldArticle.user_id, RealWorldArticle.created_at)
+        .join(Follow, Follow.followed_user_id == RealWorldArticle.user_id)
+        .where(RealWorldArticle.fanned_out)
+    )
+
+
+async def fan_out_article(db: DbSession, *, article_id: uuid.UUID) -> None:
+    # Copy the article into the feed of every follower of its author, unless the author has too many followers. Then
+    # the article stays marked as not fanned out, and is merged into the feeds on read.
+    fanned_out = await db.scalar(
+        update(RealWorldArticle)
+        .where(RealWorldArticle.id == article_id)
+        .where(RealWorldArticle.user_id == RealWorldUser.id)
+        .where(RealWorldUser.followers_count <= config.FEED_FANOUT_MAX_FOLLOWERS)
+        .values(fanned_out=True, updated_at=RealWorldArticle.updated_at, changed_at=RealWorldArticle.changed_at)
+        .returning(RealWorldArticle.id)
+        .execution_options(synchronize_session=False)
+    )
+    if fanned_out is not None:
+        await db.execute(
+            psql_insert(FeedEntry)
+            .from_select(_FEED_ENTRY_COLUMNS, _fanned_out_entries().where(RealWorldArticle.id == article_id))
+            .on_conflict_do_nothing()
+        )
+    await db.commit()
+
+
+async def fan_out_article_in_background(article_id: uuid.UUID) -> None:
+    # Runs after the response has been sent, so it can't use the request's session
+    async with sessionmaker() as db:
+        await fan_out_article(db, article_id=article_id)
+
+
+async def rebuild_feeds(db: DbSession) -> int:
+    # What fan_out_article would have written for every article, after articles or follows were loaded in bulk
+    await db.execute(
+        update(RealWorldArticle)
+        .where(~RealWorldArticle.fanned_out)
+        .where(RealWorldArticle.user_id == RealWorldUser.id)
+        .where(RealWorldUser.followers_count <= config.FEED_FANOUT_MAX_FOLLOWERS)
+        .values(fanned_out=True, updated_at=RealWorldArticle.updated_at, changed_at=RealWorldArticle.changed_at)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(
+        psql_insert(FeedEntry).from_select(_FEED_ENTRY_COLUMNS, _fanned_out_entries()).on_conflict_do_nothing()
+    )
+    await db.commit()
+    return rowcount(result)
+
+
+async def backfill_feed(db: DbSession, *, user_id: uuid.UUID, author_id: uuid.UUID) -> None:
+    # The latest fanned out articles of a newly followed author, however many followers the author has now. The
+    # others are merged in on read.
+    latest_articles = (
+        select(literal(user_id, Uuid), RealWorldArticle.id, RealWorldArticle.user_id, RealWorldArticle.created_at)
+        .where(RealWorldArticle.user_id == author_id)
+        .where(RealWorldArticle.fanned_out)
+        .order_by(RealWorldArticle.created_at.desc(), RealWorldArticle.id.desc())
+        .limit(config.FEED_BACKFILL_LIMIT)
+    )
+    await db.execute(psql_insert(FeedEntry).from_select(_FEED_ENTRY_COLUMNS, latest_articles).on_conflict_do_nothing())
+
+
+async def prune_feed(db: DbSession, *, user_id: uuid.UUID, author_id: uuid.UUID) -> None:
+    await db.execute(delete(FeedEntry).where(FeedEntry.user_id == user_id).where(FeedEntry.author_id == author_id))
+
+
+def feed_entries(
+    user_id: uuid.UUID,
+    *,
+    before: tuple[datetime, uuid.UUID] | None = None,
+    limit: int | None = None,
+) -> CompoundSelect:
+    # (article_id, created_at) of every article in the feed of the user: the materialized entries merged with the
+    # articles of followed authors that weren't fanned out, because the author had too many followers when they were
+    # published. With a limit each side is cut down before merging, which keeps reading the materialized entries an
+    # index range scan.
+    materialized = select(FeedEntry.article_id, FeedEntry.created_at).where(FeedEntry.user_id == user_id)
+    pulled = (
+        select(RealWorldArticle.id.label("article_id"), RealWorldArticle.created_at)
+        .join(Follow, Follow.followed_user_id == RealWorldArticle.user_id)
+        .where(Follow.following_user_id == user_id)
+        .where(~RealWorldArticle.fanned_out)
+    )
+
+    if before is not None:
+        before_created_at, before_article_id = literal(before[0]), literal(before[1])
+        materialized = materialized.where(
+            tuple_(FeedEntry.created_at, FeedEntry.article_id) < tuple_(before_created_at, before_article_id)
+        )
+        pulled = pulled.where(
+            tuple_(RealWorldArticle.created_at, RealWorldArticle.id) < tuple_(before_created_at, before_article_id)
+        )
+
+    if limit is not None:
+        materialized = materialized.order_by(FeedEntry.created_at.desc(), FeedEntry.article_id.desc()).limit(limit)
+        pulled = pulled.order_by(RealWorldArticle.created_at.desc(), RealWorldArticle.id.desc()).limit(limit)
+
+    return union(materialized, pulled)
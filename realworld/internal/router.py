@@ -0,0 +1,47 @@
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from realworld.articles import service as article_service
+from realworld.articles.schema import ExportQuery
+from realworld.database.core import async_engine, export_sessionmaker, replica_engine, replica_router
+from realworld.database.pool import pool_stats
+
+router = APIRouter()
+
+
+# Not part of the spec, for sizing the pools of each worker under load
+@router.get("/internal/pool")
+async def get_pool_stats() -> dict[str, Any]:
+    stats: dict[str, Any] = {"primary": pool_stats(async_engine.pool)}
+    if replica_engine is not None:
+        stats["replica"] = {
+            **pool_stats(replica_engine.pool),
+            "healthy": replica_router.healthy,
+            "lag_seconds": replica_router.lag_seconds,
+        }
+    return stats
+
+
+def _ndjson_export(export: Callable[..., AsyncIterator[bytes]], *, updated_since: datetime | None) -> StreamingResponse:
+    # The request's sessions are closed when the response starts, so the export opens its own for as long as it runs
+    async def body() -> AsyncIterator[bytes]:
+        async with export_sessionmaker() as db:
+            async for chunk in export(db, updated_since=updated_since):
+                yield chunk
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+# Not part of the spec, for nightly exports of everything rather than paging through the lists
+@router.get("/internal/export/articles")
+async def export_articles(query: ExportQuery = Depends()) -> StreamingResponse:
+    return _ndjson_export(article_service.export_articles, updated_since=query.updated_since)
+
+
+@router.get("/internal/export/comments")
+async def export_comments(query: ExportQuery = Depends()) -> StreamingResponse:
+    return _ndjson_export(article_service.export_comments, updated_since=query.updated_since)
@@ -0,0 +1,45 @@
+import uuid
+from collections.abc import Mapping
+
+from sqlalchemy import select
+
+from realworld.articles.model import RealWorldArticle
+from realworld.database.core import DbSession
+from realworld.database.loader import Loader
+from realworld.users.model import RealWorldUser
+
+
+# Request-scoped identity maps for the lookups that are repeated within a request, like the current user and the
+# article of a slug. They live on the session, which is created per request, so nothing is shared between requests.
+class RequestLoaders:
+    def __init__(self, db: DbSession) -> None:
+        self._db = db
+        self.users_by_id: Loader[uuid.UUID, RealWorldUser] = Loader(self._load_users_by_id)
+        self.users_by_username: Loader[str, RealWorldUser] = Loader(self._load_users_by_username)
+        self.articles_by_slug: Loader[str, RealWorldArticle] = Loader(self._load_articles_by_slug)
+
+    @staticmethod
+    def of(db: DbSession) -> "RequestLoaders":
+        if "loaders" not in db.info:
+            db.info["loaders"] = RequestLoaders(db)
+        return db.info["loaders"]
+
+    def _prime_users(self, users: list[RealWorldUser]) -> None:
+        # A user loaded by one key is also known by the other
+        for user in users:
+            self.users_by_id.prime(user.id, user)
+            self.users_by_username.prime(user.username, user)
+
+    async def _load_users_by_id(self, ids: list[uuid.UUID]) -> Mapping[uuid.UUID, RealWorldUser]:
+        users = list(await self._db.scalars(select(RealWorldUser).where(RealWorldUser.id.in_(ids))))
+        self._prime_users(users)
+        return {user.id: user for user in users}
+
+    async def _load_users_by_username(self, usernames: list[str]) -> Mapping[str, RealWorldUser]:
+        users = list(await self._db.scalars(select(RealWorldUser).where(RealWorldUser.username.in_(usernames))))
+        self._prime_users(users)
+        return {user.username: user for user in users}
+
+    async def _load_articles_by_slug(self, slugs: list[str]) -> Mapping[str, RealWorldArticle]:
+        articles = await self._db.scalars(select(RealWorldArticle).where(RealWorldArticle.slug.in_(slugs)))
+        return {article.slug: article for article in articles}
@@ -6,7 +6,19 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from realworld import config
 from realworld.api import api_router
+from realworld.database.core import async_engine, replica_engine, replica_router
+from realworld.database.instrumentation import QueryLogMiddleware, instrument_engine
+from realworld.database.scoping import RequestSessionsMiddleware
 from realworld.logger import configure_logging
+from realworld.metrics import (
+    MetricsMiddleware,
+    metrics_endpoint,
+    register_auth_user_cache,
+    register_password_hasher,
+    register_pool,
+)
+from realworld.users.cache import auth_user_cache
+from realworld.users.passwords import password_hasher
 
 load_dotenv()
 configure_logging()
@@ -18,8 +30,34 @@ app.add_middleware(
     allow_headers=config.CORS_ALLOWED_HEADERS if not config.CORS_ORIGIN_ALLOW_ALL else ["*"],
     allow_methods=config.CORS_ALLOWED_METHODS if not config.CORS_ORIGIN_ALLOW_ALL else ["*"],
 )
+app.add_middleware(RequestSessionsMiddleware)
 app.include_router(api_router, prefix="/api")
 
+instrument_engine(async_engine)
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+app.add_middleware(QueryLogMiddleware, routes=app.router.routes)
+
+if config.METRICS_ENABLED:
+    register_pool(async_engine, "primary")
+    if replica_engine is not None:
+        register_pool(replica_engine, "replica")
+    register_auth_user_cache(auth_user_cache)
+    register_password_hasher(password_hasher)
+    # Added last so that it's the outermost middleware and times everything else
+    app.add_middleware(MetricsMiddleware, routes=app.router.routes)
+    app.add_route(config.METRICS_PATH, metrics_endpoint, include_in_schema=False)
+
+
+@app.on_event("startup")
+async def start_replica_checks() -> None:
+    replica_router.start()
+
+
+@app.on_event("shutdown")
+async def stop_replica_checks() -> None:
+    await replica_router.stop()
+
 
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(_: Request, exc: StarletteHTTPException) -> JSONResponse:
@@ -0,0 +1,263 @@
+import bisect
+import math
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from realworld.database.instrumentation import route_template
+from realworld.database.pool import pool_stats
+from realworld.users.cache import AuthUserCache
+from realworld.users.passwords import PasswordHasher
+
+# Metrics are kept in memory, per worker process, and exposed in the Prometheus text format:
+# https://prometheus.io/docs/instrumenting/exposition_formats/#text-based-format
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, Sequence[str], Sequence[str], float]]:
+        ...
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def set_total(self, *label_values: str, value: float) -> None:
+        # For totals that are counted elsewhere and read when rendering
+        self._values[label_values] = value
+
+    def samples(self) -> Iterable[tuple[str, Sequence[str], Sequence[str], float]]:
+        for label_values, value in self._values.items():
+            yield "", self.labels, label_values, value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float) -> None:
+        self._values[label_values] = value
+
+    def samples(self) -> Iterable[tuple[str, Sequence[str], Sequence[str], float]]:
+        for label_values, value in self._values.items():
+            yield "", self.labels, label_values, value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: the count of each bucket, not cumulative, then the sum of all observations
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, *label_values: str, value: float) -> None:
+        counts = self._counts.setdefault(label_values, [0] * (len(self.buckets) + 1))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[label_values] = self._sums.get(label_values, 0) + value
+
+    def samples(self) -> Iterable[tuple[str, Sequence[str], Sequence[str], float]]:
+        names = (*self.labels, "le")
+        for label_values, counts in self._counts.items():
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                yield "_bucket", names, (*label_values, _format_value(upper_bound)), cumulative
+            yield "_sum", self.labels, label_values, self._sums[label_values]
+            yield "_count", self.labels, label_values, cumulative
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        counter = Counter(name, documentation, labels)
+        self.register(counter)
+        return counter
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        gauge = Gauge(name, documentation, labels)
+        self.register(gauge)
+        return gauge
+
+    def histogram(
+        self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, labels, buckets)
+        self.register(histogram)
+        return histogram
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        # Called before every render, to update gauges that are read rather than tracked
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter("http_requests_total", "Requests handled", ["method", "route", "status"])
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time spent handling requests", ["method", "route"]
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "Requests being handled", ["method", "route"])
+db_request_duration = registry.histogram(
+    "db_request_duration_seconds", "Time spent in database queries per request", ["method", "route"]
+)
+db_request_queries = registry.histogram(
+    "db_request_queries", "Database queries run per request", ["method", "route"], buckets=QUERY_COUNT_BUCKETS
+)
+db_pool_connections = registry.gauge(
+    "db_pool_connections", "Connections of each engine's pool, by state", ["engine", "state"]
+)
+db_pool_checkouts = registry.counter("db_pool_checkouts_total", "Connections checked out of the pool", ["engine"])
+db_pool_checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a connection", ["engine"]
+)
+db_pool_checkout_wait = registry.counter(
+    "db_pool_checkout_wait_seconds_total", "Time spent waiting for a pool connection", ["engine"]
+)
+auth_user_cache_lookups = registry.counter(
+    "auth_user_cache_lookups_total", "Lookups of tokens in the authenticated user cache", ["result"]
+)
+auth_user_cache_entries = registry.gauge("auth_user_cache_entries", "Tokens in the authenticated user cache")
+password_hash_queue_depth = registry.gauge(
+    "password_hash_queue_depth", "Password hashes and checks waiting for a free hashing worker"
+)
+
+
+def register_pool(engine: AsyncEngine, name: str) -> None:
+    def collect_pool() -> None:
+        stats = pool_stats(engine.pool)
+        for state in ("checked_out", "idle", "overflow"):
+            if state in stats:
+                db_pool_connections.set(name, state, value=stats[state])
+        if "checkouts" in stats:
+            db_pool_checkouts.set_total(name, value=stats["checkouts"])
+            db_pool_checkout_timeouts.set_total(name, value=stats["checkout_timeouts"])
+            db_pool_checkout_wait.set_total(name, value=stats["checkout_wait_seconds"])
+
+    registry.add_collector(collect_pool)
+
+
+def register_auth_user_cache(cache: AuthUserCache) -> None:
+    def collect_auth_user_cache() -> None:
+        stats = cache.stats()
+        auth_user_cache_lookups.set_total("hit", value=stats["hits"])
+        auth_user_cache_lookups.set_total("miss", value=stats["misses"])
+        auth_user_cache_entries.set(value=stats["size"])
+
+    registry.add_collector(collect_auth_user_cache)
+
+
+def register_password_hasher(hasher: PasswordHasher) -> None:
+    def collect_password_hasher() -> None:
+        password_hash_queue_depth.set(value=hasher.queue_depth)
+
+    registry.add_collector(collect_password_hasher)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]) -> None:
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.routes, scope)
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(method, route)
+            http_request_duration.observe(method, route, value=time.perf_counter() - start)
+            http_requests.inc(method, route, status)
+            # Left by QueryLogMiddleware
+            if (log := scope.get("realworld.query_log")) is not None:
+                db_request_duration.observe(method, route, value=log.seconds)
+                db_request_queries.observe(method, route, value=log.count)
+
+
+async def metrics_endpoint(_: Request) -> Response:
+    return Response(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,6 @@
 # ruff: noqa: F401
 # for alembic
-from realworld.articles.model import ArticleComment, ArticleFavorite, RealWorldArticle
+from realworld.articles.model import ArticleComment, ArticleFavorite, ArticleTag, RealWorldArticle, Tag
+from realworld.feed.model import FeedEntry
 from realworld.profiles.model import Follow
 from realworld.users.model import RealWorldUser
@@ -0,0 +1,26 @@
+import base64
+import binascii
+import json
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from realworld.exceptions import InvalidCursorError
+
+
+def encode_cursor(*values: datetime | uuid.UUID | float | str) -> str:
+    # Cursors are opaque to clients, they're just the sort key of the last row on a page
+    parts = [value.isoformat() if isinstance(value, datetime) else str(value) for value in values]
+    return base64.urlsafe_b64encode(json.dumps(parts).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[str], Any]) -> tuple[Any, ...]:
+    try:
+        parts = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(parts, list) or len(parts) != len(parsers):
+            raise InvalidCursorError()
+
+        return tuple(parse(part) for parse, part in zip(parsers, parts, strict=True))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursorError() from None
@@ -1,8 +1,10 @@
 from http import HTTPStatus
+from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 
-from realworld.database.core import DbSession
+from realworld.database.core import DbSession, ReadDbSession
+from realworld.etags import etag_matches, not_modified
 from realworld.profiles import service
 from realworld.profiles.exceptions import ProfileNotFoundError
 from realworld.profiles.schema import Profile, ProfileBody
@@ -15,12 +17,23 @@ router = APIRouter()
 # https://www.realworld.how/docs/specs/backend-specs/endpoints#get-profile
 @router.get("/profiles/{username}", status_code=HTTPStatus.OK, response_model=ProfileBody[Profile])
 async def get_user_profile(
-    db: DbSession, username: str, maybe_current_user: AuthUser | None = Depends(maybe_get_current_user)
-) -> ProfileBody[Profile]:
+    db: ReadDbSession,
+    username: str,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+    maybe_current_user: AuthUser | None = Depends(maybe_get_current_user),
+) -> ProfileBody[Profile] | Response:
+    if (etag := await service.get_profile_etag(db, username=username, current_user=maybe_current_user)) is None:
+        raise ProfileNotFoundError()
+
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     profile = await service.get_profile(db, identifier=username, current_user=maybe_current_user)
     if profile is None:
         raise ProfileNotFoundError()
 
+    response.headers["ETag"] = etag
     return ProfileBody(profile=profile)
 
 
@@ -1,9 +1,15 @@
 import uuid
+from collections.abc import Iterable
+from typing import Any
 
-from sqlalchemy import delete, exists, select
+from sqlalchemy import SQLColumnExpression, delete, exists, func, select, update
 from sqlalchemy.dialects.postgresql import insert as psql_insert
 
-from realworld.database.core import DbSession
+from realworld.database.core import DbSession, rowcount
+from realworld.etags import make_etag
+from realworld.feed import service as feed_service
+from realworld.feed.cache import feed_count_cache
+from realworld.loaders import RequestLoaders
 from realworld.profiles.model import Follow
 from realworld.profiles.schema import Profile
 from realworld.users.model import RealWorldUser
@@ -12,9 +18,9 @@ from realworld.users.schema import AuthUser
 
 async def get_profile(db: DbSession, *, identifier: uuid.UUID | str, current_user: AuthUser | None) -> Profile | None:
     if isinstance(identifier, str):
-        user = await RealWorldUser.by_username(db, identifier)
+        user = await RequestLoaders.of(db).users_by_username.load(identifier)
     else:
-        user = await RealWorldUser.by_id(db, identifier)
+        user = await RequestLoaders.of(db).users_by_id.load(identifier)
 
     if user is None:
         return None
@@ -37,42 +43,98 @@ async def get_profile(db: DbSession, *, identifier: uuid.UUID | str, current_use
     )
 
 
+async def _add_to_followers_count(db: DbSession, *, user_id: uuid.UUID, delta: int) -> None:
+    await db.execute(
+        update(RealWorldUser)
+        .where(RealWorldUser.id == user_id)
+        .values(followers_count=RealWorldUser.followers_count + delta, updated_at=RealWorldUser.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def repair_followers_counts(db: DbSession) -> int:
+    actual_count = (
+        select(func.count()).select_from(Follow).where(Follow.followed_user_id == RealWorldUser.id).scalar_subquery()
+    )
+    result = await db.execute(
+        update(RealWorldUser)
+        .where(RealWorldUser.followers_count != actual_count)
+        .values(followers_count=actual_count, updated_at=RealWorldUser.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return rowcount(result)
+
+
+async def get_profile_etag(db: DbSession, *, username: str, current_user: AuthUser | None) -> str | None:
+    columns: list[SQLColumnExpression[Any]] = [RealWorldUser.id, RealWorldUser.updated_at]
+    if current_user is not None:
+        columns.append(
+            exists()
+            .where(Follow.followed_user_id == RealWorldUser.id)
+            .where(Follow.following_user_id == current_user.user_id)
+        )
+
+    row = (await db.execute(select(*columns).where(RealWorldUser.username == username))).first()
+    return make_etag("profile", *row) if row is not None else None
+
+
 async def follow_user(db: DbSession, *, username: str, current_user: AuthUser) -> Profile | None:
-    if (user := await RealWorldUser.by_username(db, username)) is None:
+    if (user := await RequestLoaders.of(db).users_by_username.load(username)) is None:
         return None
 
-    await db.execute(
+    followed = await db.scalar(
         psql_insert(Follow)
         .values(
             followed_user_id=user.id,
             following_user_id=current_user.user_id,
         )
         .on_conflict_do_nothing()
+        .returning(Follow.followed_user_id)
     )
+    if followed is not None:
+        await _add_to_followers_count(db, user_id=user.id, delta=1)
+        await feed_service.backfill_feed(db, user_id=current_user.id, author_id=user.id)
+
     await db.commit()
+    if followed is not None:
+        feed_count_cache.invalidate_user(current_user.id)
 
     return await get_profile(db, identifier=user.id, current_user=current_user)
 
 
 async def unfollow_user(db: DbSession, *, username: str, current_user: AuthUser) -> Profile | None:
-    if (user := await RealWorldUser.by_username(db, username)) is None:
+    if (user := await RequestLoaders.of(db).users_by_username.load(username)) is None:
         return None
 
-    await db.execute(
-        delete(Follow).where(Follow.followed_user_id == user.id).where(Follow.following_user_id == current_user.user_id)
+    unfollowed = await db.scalar(
+        delete(Follow)
+        .where(Follow.followed_user_id == user.id)
+        .where(Follow.following_user_id == current_user.user_id)
+        .returning(Follow.followed_user_id)
     )
+    if unfollowed is not None:
+        await _add_to_followers_count(db, user_id=user.id, delta=-1)
+        await feed_service.prune_feed(db, user_id=current_user.id, author_id=user.id)
+
+    await db.commit()
+    if unfollowed is not None:
+        feed_count_cache.invalidate_user(current_user.id)
 
     return await get_profile(db, identifier=user.id, current_user=current_user)
 
 
-async def is_following(db: DbSession, *, username: str, current_user: AuthUser) -> bool:
-    if (user := await RealWorldUser.by_username(db, username)) is None:
-        return False
+async def get_followed_user_ids(
+    db: DbSession, *, user_ids: Iterable[uuid.UUID], current_user: AuthUser
+) -> set[uuid.UUID]:
+    # The ones among user_ids that the current user follows, in a single query
+    user_ids = set(user_ids)
+    if not user_ids:
+        return set()
 
-    following = await db.scalar(
-        select(
-            exists().where(Follow.followed_user_id == user.id).where(Follow.following_user_id == current_user.user_id)
-        )
+    followed = await db.scalars(
+        select(Follow.followed_user_id)
+        .where(Follow.following_user_id == current_user.user_id)
+        .where(Follow.followed_user_id.in_(user_ids))
     )
-
-    return following or False
+    return set(followed.all())
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, NamedTuple, Protocol
+
+from fastapi.responses import Response
+
+from realworld import config
+from realworld.logger import logger
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    stored_at: float
+
+
+class CacheBackend(Protocol):
+    # Whether every process sees the same entries, and so the invalidations made by any of them
+    shared: bool
+
+    async def get(self, key: str) -> CachedResponse | None:
+        ...
+
+    async def set(self, key: str, value: CachedResponse, *, tags: Iterable[str], ttl_seconds: float) -> None:
+        ...
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        ...
+
+
+# Per process, so a write only invalidates the entries of the worker that handled it. The others keep theirs until
+# they expire, which max_ttl_seconds keeps short whatever the fresh and stale windows are.
+class InMemoryCacheBackend:
+    shared = False
+
+    def __init__(self, *, max_entries: int, max_ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries: OrderedDict[str, tuple[CachedResponse, float, frozenset[str]]] = OrderedDict()
+        self._keys_by_tag: dict[str, set[str]] = {}
+
+    async def get(self, key: str) -> CachedResponse | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.time():
+            self._delete(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: CachedResponse, *, tags: Iterable[str], ttl_seconds: float) -> None:
+        self._delete(key)
+        tags = frozenset(tags)
+        self._entries[key] = (value, time.time() + min(ttl_seconds, self.max_ttl_seconds), tags)
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._delete(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in self._keys_by_tag.pop(tag, set()):
+                self._delete(key)
+
+    def _delete(self, key: str) -> None:
+        if (entry := self._entries.pop(key, None)) is None:
+            return
+
+        for tag in entry[2]:
+            if (keys := self._keys_by_tag.get(tag)) is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+# Shares the cache between processes through anything that speaks the Redis protocol, a local redis-server is enough.
+# The redis package is only needed when this backend is configured.
+class RedisCacheBackend:
+    shared = True
+
+    def __init__(self, url: str, *, prefix: str = "realworld:response:") -> None:
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError(f"the redis package is required for RESPONSE_CACHE_URL={url}") from None
+
+        self.prefix = prefix
+        self._redis: Any = redis.from_url(url)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        entry = await self._redis.hmget(self.prefix + key, "body", "stored_at")
+        if entry[0] is None or entry[1] is None:
+            return None
+
+        return CachedResponse(body=entry[0], stored_at=float(entry[1]))
+
+    async def set(self, key: str, value: CachedResponse, *, tags: Iterable[str], ttl_seconds: float) -> None:
+        ttl = max(1, int(ttl_seconds))
+        async with self._redis.pipeline(transaction=True) as pipeline:
+            pipeline.hset(self.prefix + key, mapping={"body": value.body, "stored_at": value.stored_at})
+            pipeline.expire(self.prefix + key, ttl)
+            for tag in tags:
+                pipeline.sadd(self._tag_key(tag), key)
+                pipeline.expire(self._tag_key(tag), ttl)
+            await pipeline.execute()
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            keys = await self._redis.smembers(self._tag_key(tag))
+            await self._redis.delete(self._tag_key(tag), *(self.prefix + key.decode("utf-8") for key in keys))
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+
+# Cache of pre-serialized responses with stale-while-revalidate: fresh entries are served as is, stale ones are served
+# while a single background refresh replaces them, and invalidated ones are gone. An entry computed while an
+# invalidation happened in this process isn't stored, since it might predate the write. That guard only covers this
+# process, an entry computed in another one while the write happened can still be stored.
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, *, fresh_seconds: float, stale_seconds: float) -> None:
+        self.backend = backend
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._refreshing: dict[str, asyncio.Task[None]] = {}
+
+    async def get_or_compute(self, key: str, *, tags: Iterable[str], compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        tags = list(tags)
+        if (cached := await self.backend.get(key)) is not None:
+            if time.time() - cached.stored_at < self.fresh_seconds:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh_in_background(key, tags=tags, compute=compute)
+            return cached.body
+
+        self.misses += 1
+        return await self._compute_and_store(key, tags=tags, compute=compute)
+
+    async def invalidate(self, *tags: str) -> None:
+        self._generation += 1
+        await self.backend.invalidate(tags)
+
+    async def _compute_and_store(self, key: str, *, tags: list[str], compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        generation = self._generation
+        body = await compute()
+        if generation == self._generation:
+            await self.backend.set(
+                key,
+                CachedResponse(body=body, stored_at=time.time()),
+                tags=tags,
+                ttl_seconds=self.fresh_seconds + self.stale_seconds,
+            )
+        return body
+
+    def _refresh_in_background(self, key: str, *, tags: list[str], compute: Callable[[], Awaitable[bytes]]) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._compute_and_store(key, tags=tags, compute=compute)
+            except Exception:
+                logger.exception("Refreshing cached response %s failed", key)
+
+        task = asyncio.create_task(refresh())
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+
+def cached_json_response(body: bytes, headers: dict[str, str] | None = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _create_backend(url: str) -> CacheBackend:
+    if url.startswith("memory://"):
+        return InMemoryCacheBackend(
+            max_entries=config.RESPONSE_CACHE_MAX_ENTRIES, max_ttl_seconds=config.RESPONSE_CACHE_MEMORY_TTL_SECONDS
+        )
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"unsupported RESPONSE_CACHE_URL: {url}")
+
+
+response_cache = ResponseCache(
+    _create_backend(config.RESPONSE_CACHE_URL),
+    fresh_seconds=config.RESPONSE_CACHE_FRESH_SECONDS,
+    stale_seconds=config.RESPONSE_CACHE_STALE_SECONDS,
+)
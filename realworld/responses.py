@@ -0,0 +1,40 @@
+from typing import Any, TypeVar
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from realworld import config
+
+if config.FAST_JSON_RESPONSES:
+    try:
+        import orjson
+    except ImportError:
+        raise RuntimeError("the orjson package is required for FAST_JSON_RESPONSES") from None
+
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:  # noqa: ANN401
+        # orjson writes datetimes and UUIDs the same way jsonable_encoder does
+        return orjson.dumps(content)
+
+
+def render_json(content: BaseModel) -> bytes:
+    # The same bytes FastAPI sends for the model as a response_model
+    if config.FAST_JSON_RESPONSES:
+        return orjson.dumps(content.dict(by_alias=True))
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def json_response(content: M, headers: dict[str, str] | None = None, *, partial: bool = False) -> M | Response:
+    # The models returned by the services were validated when they were built. Returning a response skips FastAPI
+    # validating them a second time against the response_model, and dict() applies the camelCase aliases.
+    # Partial models, built with construct(), would fail that validation so they're always returned as a response.
+    if config.FAST_JSON_RESPONSES:
+        return FastJSONResponse(content.dict(by_alias=True), headers=headers)
+    if partial:
+        return JSONResponse(jsonable_encoder(content), headers=headers)
+    return content
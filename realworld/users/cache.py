@@ -0,0 +1,66 @@
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from realworld import config
+from realworld.users.schema import AuthUser
+
+
+# Bounded LRU cache of verified tokens to the user they resolve to, so that authenticated requests don't have to look
+# the user up every time. Entries expire after a TTL or when the token does, whichever comes first, and all of a user's
+# entries are dropped as soon as they're updated. The cache is per process, so the TTL bounds how long other workers
+# may keep serving a user from before an update.
+class AuthUserCache:
+    def __init__(self, *, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[AuthUser, float]] = OrderedDict()
+        # Only the users with entries, so it's bounded like the entries are
+        self._tokens_by_user: dict[uuid.UUID, set[str]] = {}
+
+    def get(self, token: str) -> AuthUser | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        user, expires_at = entry
+        if expires_at <= time.time():
+            self._delete(token)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def set(self, token: str, user: AuthUser, *, token_expires_at: datetime) -> None:
+        if self.max_size <= 0 or user.user_id is None:
+            return
+
+        expires_at = min(time.time() + self.ttl_seconds, token_expires_at.timestamp())
+        self._entries[token] = (user, expires_at)
+        self._entries.move_to_end(token)
+        self._tokens_by_user.setdefault(user.user_id, set()).add(token)
+        while len(self._entries) > self.max_size:
+            self._delete(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        for token in self._tokens_by_user.pop(user_id, set()):
+            del self._entries[token]
+
+    def _delete(self, token: str) -> None:
+        user, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user[user.id]
+        tokens.discard(token)
+        if not tokens:
+            del self._tokens_by_user[user.id]
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+auth_user_cache = AuthUserCache(max_size=config.AUTH_CACHE_MAX_SIZE, ttl_seconds=config.AUTH_CACHE_TTL_SECONDS)
@@ -1,51 +1,75 @@
+import uuid
 from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import Header
 
-from realworld.database.core import DbSession
+from realworld.database.core import lookup_sessionmaker
+from realworld.database.routing import current_user_id
+from realworld.users.cache import auth_user_cache
 from realworld.users.exceptions import CredentialValidationError, MissingAuthorizationHeaderError, UserNotFoundError
 from realworld.users.jwt_claims import JwtClaims
 from realworld.users.model import RealWorldUser
 from realworld.users.schema import AuthUser, User
 
 
-def _extract_token(authorization: str, required: bool = True) -> str:
-    token_name, token = authorization.split()
-    if token_name.lower() != "token" and required:
-        raise MissingAuthorizationHeaderError()
+def _extract_token(authorization: str, required: bool = True) -> str | None:
+    # None for a malformed header, which is turned down before anything touches the database
+    match authorization.split():
+        case [token_name, token] if token_name.lower() == "token" or not required:
+            return token
+    return None
+
+
+async def _load_user(user_id: uuid.UUID) -> RealWorldUser | None:
+    # In a session of its own that's closed right away, rather than the route's, so that authenticating doesn't hold a
+    # connection of the primary for the rest of a read-only request
+    async with lookup_sessionmaker() as session:
+        return await session.get(RealWorldUser, user_id)
 
-    return token
 
+async def get_current_user(authorization: str = Header()) -> AuthUser:
+    if (token := _extract_token(authorization)) is None:
+        raise MissingAuthorizationHeaderError()
 
-async def get_current_user(db: DbSession, authorization: str = Header()) -> AuthUser:
-    token = _extract_token(authorization)
+    if (auth_user := auth_user_cache.get(token)) is not None:
+        current_user_id.set(auth_user.user_id)
+        return auth_user
 
     try:
         claims = JwtClaims.from_token(token)
-        if not (user := await RealWorldUser.by_id(db, id=claims.user_id)):
+        if not (user := await _load_user(claims.user_id)):
             raise UserNotFoundError()
 
-        return AuthUser(**User.from_orm(user).dict(), token=token, user_id=claims.user_id)
+        auth_user = AuthUser(**User.from_orm(user).dict(), token=token, user_id=claims.user_id)
+        auth_user_cache.set(token, auth_user, token_expires_at=claims.exp)
+        current_user_id.set(auth_user.user_id)
+        return auth_user
 
     except Exception:
         raise CredentialValidationError() from None
 
 
-async def maybe_get_current_user(
-    db: DbSession, authorization: Annotated[str | None, Header()] = None
-) -> AuthUser | None:
+async def maybe_get_current_user(authorization: Annotated[str | None, Header()] = None) -> AuthUser | None:
     if not authorization:
         return None
 
-    token = _extract_token(authorization, required=False)
+    if (token := _extract_token(authorization, required=False)) is None:
+        return None
+
+    if (auth_user := auth_user_cache.get(token)) is not None:
+        current_user_id.set(auth_user.user_id)
+        return auth_user
 
     try:
         claims = JwtClaims.from_token(token)
-        if not (user := await RealWorldUser.by_id(db, id=claims.user_id)):
+        if not (user := await _load_user(claims.user_id)):
             return None
 
-        return AuthUser(**User.from_orm(user).dict(), token=token, user_id=claims.user_id)
+        auth_user = AuthUser(**User.from_orm(user).dict(), token=token, user_id=claims.user_id)
+        auth_user_cache.set(token, auth_user, token_expires_at=claims.exp)
+        current_user_id.set(auth_user.user_id)
+        return auth_user
 
     except Exception:
         return None
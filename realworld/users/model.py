@@ -3,13 +3,13 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timedelta, timezone
 
-import bcrypt
-from sqlalchemy import DateTime, String, Uuid, func, select
+from sqlalchemy import DateTime, Integer, String, Uuid, func, select
 from sqlalchemy.orm import mapped_column
 
 from realworld.config import JWT_EXP_MINUTES
 from realworld.database.core import Base, DbSession
 from realworld.users.jwt_claims import JwtClaims
+from realworld.users.passwords import password_hasher
 
 
 class RealWorldUser(Base):
@@ -22,6 +22,8 @@ class RealWorldUser(Base):
     bio = mapped_column(String, nullable=False, default="")
     image = mapped_column(String, nullable=True)
     password_hash = mapped_column(String, nullable=False)
+    # Denormalized count of follow rows, kept in sync by the follow/unfollow service functions
+    followers_count = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = mapped_column(DateTime(timezone=True), nullable=True, onupdate=func.now())
 
@@ -43,8 +45,8 @@ class RealWorldUser(Base):
             select(RealWorldUser).where((RealWorldUser.email == email) | (RealWorldUser.username == username))
         )
 
-    def password_matches(self, password: str) -> bool:
-        return bcrypt.checkpw(password.encode("utf-8"), str(self.password_hash).encode("utf-8"))
+    async def password_matches(self, password: str) -> bool:
+        return await password_hasher.verify(password, str(self.password_hash))
 
     def gen_jwt(self) -> str:
         now = datetime.now(tz=timezone.utc)
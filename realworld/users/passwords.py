@@ -0,0 +1,51 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+import bcrypt
+
+from realworld import config
+
+T = TypeVar("T")
+
+
+# bcrypt is deliberately slow, so hashing on the event loop would stall every other request. It releases the GIL, so a
+# thread pool is enough to run it concurrently. Callers past the concurrency limit wait their turn on the loop and are
+# counted in queue_depth.
+class PasswordHasher:
+    def __init__(self, *, workers: int, rounds: int) -> None:
+        self.workers = workers
+        self.rounds = rounds
+        self.queue_depth = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        self._slots = asyncio.Semaphore(workers)
+
+    async def _run(self, fn: Callable[..., T], *args: bytes) -> T:
+        self.queue_depth += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        password_hash = await self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt(self.rounds))
+        return password_hash.decode("utf-8")
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # bcrypt hashes look like $2b$<rounds>$<salt and hash>
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher(workers=config.PASSWORD_HASH_WORKERS, rounds=config.PASSWORD_HASH_ROUNDS)
@@ -13,6 +13,7 @@ from realworld.users.exceptions import (
     UsernameAlreadyExistsError,
 )
 from realworld.users.model import RealWorldUser
+from realworld.users.passwords import password_hasher
 
 from .schema import (
     AuthUser,
@@ -50,9 +51,13 @@ async def create_user(
 async def log_in_user(db: DbSession, body: UserBody[LoginUser]) -> UserBody[AuthUser]:
     user = await RealWorldUser.by_email(db, body.user.email)
 
-    if user is None or not user.password_matches(body.user.password):
+    if user is None or not await user.password_matches(body.user.password):
         raise InvalidEmailOrPasswordError()
 
+    # The configured cost changed since the password was hashed
+    if password_hasher.needs_rehash(str(user.password_hash)):
+        await service.rehash_password(db, user=user, password=body.user.password)
+
     authenticated_user = AuthUser(**User.from_orm(user).dict(), token=user.gen_jwt())
     return UserBody(user=authenticated_user)
 
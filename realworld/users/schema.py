@@ -1,7 +1,7 @@
+import uuid
 from typing import Generic, TypeVar
 
-import bcrypt
-from pydantic import UUID4, EmailStr, Field, HttpUrl, validator
+from pydantic import UUID4, EmailStr, Field, HttpUrl
 from pydantic.generics import GenericModel
 
 from realworld.schemas import RealWorldBaseModel
@@ -9,10 +9,6 @@ from realworld.schemas import RealWorldBaseModel
 T = TypeVar("T", bound="RealWorldBaseModel")
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-
-
 # https://realworld-docs.netlify.app/docs/specs/backend-specs/api-response-format/#users-for-authentication
 class UserBody(GenericModel, Generic[T]):
     user: T
@@ -29,12 +25,17 @@ class AuthUser(User):
     user_id: UUID4 | None = Field(exclude=True)
     token: str | None = None
 
+    @property
+    def id(self) -> uuid.UUID:
+        # Only the users returned on registration and login are built without user_id, never the current user
+        if self.user_id is None:
+            raise ValueError("the user has no user_id")
+        return self.user_id
+
 
 class NewUser(User):
     password: str
 
-    _hash_password = validator("password", allow_reuse=True)(hash_password)
-
 
 class LoginUser(RealWorldBaseModel):
     email: EmailStr
@@ -47,5 +48,3 @@ class UpdateUser(RealWorldBaseModel):
     password: str | None = None
     bio: str | None = None
     image: HttpUrl | None = None
-
-    _hash_password = validator("password", allow_reuse=True)(hash_password)
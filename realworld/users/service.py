@@ -1,14 +1,17 @@
 import sqlalchemy as sa
 
+from realworld.articles import cache as articles_cache
 from realworld.database.core import DbSession
 
+from .cache import auth_user_cache
 from .model import RealWorldUser
+from .passwords import password_hasher
 from .schema import AuthUser, NewUser, UpdateUser
 
 
 async def create_user(db: DbSession, *, user_in: NewUser) -> RealWorldUser:
     user = RealWorldUser(
-        password_hash=user_in.password,
+        password_hash=await password_hasher.hash(user_in.password),
         **user_in.dict(exclude={"password"}),
     )
     db.add(user)
@@ -17,11 +20,24 @@ async def create_user(db: DbSession, *, user_in: NewUser) -> RealWorldUser:
 
 
 async def update_user(db: DbSession, *, user: AuthUser, user_in: UpdateUser) -> RealWorldUser:
+    values = user_in.dict(exclude_none=True, exclude={"password"})
+    if user_in.password is not None:
+        values["password_hash"] = await password_hasher.hash(user_in.password)
+
     result = await db.execute(
-        sa.update(RealWorldUser)
-        .where(RealWorldUser.id == user.user_id)
-        .values(**user_in.dict(exclude_none=True))
-        .returning(RealWorldUser)
+        sa.update(RealWorldUser).where(RealWorldUser.id == user.user_id).values(**values).returning(RealWorldUser)
     )
     await db.commit()
+    auth_user_cache.invalidate_user(user.id)
+    await articles_cache.invalidate_profiles()
     return result.scalar_one()
+
+
+async def rehash_password(db: DbSession, *, user: RealWorldUser, password: str) -> None:
+    await db.execute(
+        sa.update(RealWorldUser)
+        .where(RealWorldUser.id == user.id)
+        .values(password_hash=await password_hasher.hash(password), updated_at=RealWorldUser.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()